@@ -0,0 +1,78 @@
+"""Full-window backdrops built once per size.
+
+A Backdrop turns one image into a display-format surface the size of the
+target, either tiled over it (the sky) or placed at a position (menu, game
+over and win screens), so drawing it is a single blit no matter how many
+copies of the image it takes. A tiled backdrop is built one image larger
+than the target and blitted through a target-sized window at the scroll
+position modulo the image size; its parallax factor scales the scroll, so
+a distant layer can move slower than the world in front of it.
+"""
+import pygame
+from pgzero import loaders
+
+
+def _display_format(surf, alpha=False):
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha() if alpha else surf.convert()
+
+
+class Backdrop(object):
+    def __init__(self, key, tile=True, pos=None, parallax=1.0, fallback_color="black"):
+        self.key = key
+        self.tile = tile
+        self.pos = pos                  # placed images: top-left, or None to centre
+        self.parallax = parallax
+        self.fallback_color = fallback_color
+        self._built = {}                # size -> (surface, tile period or None)
+
+    def _image(self):
+        try:
+            return loaders.images.load(self.key)
+        except Exception:
+            return None
+
+    def _build(self, size):
+        w, h = size
+        image = self._image()
+        if image is None:
+            surf = pygame.Surface(size)
+            surf.fill(pygame.Color(self.fallback_color))
+            return _display_format(surf), None
+        sw, sh = image.get_size()
+        if self.tile:
+            surf = pygame.Surface((w + sw, h + sh))
+            surf.blits([(image, (x, y)) for y in range(0, h + sh, sh) for x in range(0, w + sw, sw)],
+                       doreturn=False)
+            return _display_format(surf), (sw, sh)
+        pos = self.pos if self.pos is not None else ((w - sw) // 2, (h - sh) // 2)
+        # An image that leaves part of the target uncovered keeps it see-through there
+        covers = pygame.Rect(pos, (sw, sh)).contains(pygame.Rect(0, 0, w, h))
+        surf = pygame.Surface(size, 0 if covers else pygame.SRCALPHA)
+        surf.blit(image, pos)
+        return _display_format(surf, alpha=not covers), None
+
+    def surface(self, size):
+        """(built surface, tile period or None) for a target of size, built on first use."""
+        size = tuple(size)
+        built = self._built.get(size)
+        if built is None:
+            built = self._built[size] = self._build(size)
+        return built
+
+    def draw(self, surf, scroll=(0, 0)):
+        """Cover surf; scroll is the world position of its top-left (only tiled backdrops move)."""
+        w, h = surf.get_size()
+        backdrop, period = self.surface((w, h))
+        if period is None:
+            surf.blit(backdrop, (0, 0))
+            return
+        sw, sh = period
+        x = int(scroll[0] * self.parallax) % sw
+        y = int(scroll[1] * self.parallax) % sh
+        surf.blit(backdrop, (0, 0), (x, y, w, h))
+
+    def invalidate(self):
+        """Forget built surfaces (after the image or the display format changes)."""
+        self._built = {}
@@ -0,0 +1,225 @@
+"""Micro and macro benchmarks for the engine hot paths.
+
+Runs headless (SDL dummy drivers, through sim.load_game) and times each
+piece on its own: level layer builds, Sprite construction and flipping,
+pixel-perfect collision pairs, Player.update, PigEnemy.move and a whole
+update()+draw() frame, also presented to the display in full and with the
+dirty-rect renderer. Each result is the best per-call time over several
+repeats.
+
+    python bench.py                              # print a table
+    python bench.py --json bench.json            # also save the results
+    python bench.py --baseline bench.json        # compare; exit 1 on regressions
+    python bench.py --baseline bench.json --threshold 0.25 --filter collide
+"""
+import json
+import platform
+import sys
+import time
+
+from sim import load_game
+
+LAYER_CSVS = {
+    "platformer": "platformer_platformer.csv",
+    "obstacles": "platformer_obstacles.csv",
+    "coins": "platformer_coins.csv",
+    "cenario": "platformer_cenario.csv",
+}
+
+
+def _time(fn, number, repeat):
+    """Best seconds per call of fn over `repeat` batches of `number` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def _setup():
+    game = load_game()
+    import pygame
+    import pgzero.game
+    from pgzero.screen import Screen
+    surf = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+    pgzero.game.screen = surf  # what Tile.draw() and Actor.draw() blit to
+    game.screen = Screen(surf)
+    game.pig_rng.seed(0)
+    return game
+
+
+def benchmarks(game):
+    """{name: (callable, calls per batch)}; callables may move game actors."""
+    import platformer
+    from collisions import pixel_perfect_collide
+    from platformer import Sprite, SpriteActor
+
+    found = {}
+    for name, csv in LAYER_CSVS.items():
+        found[f"build/{name}"] = (lambda csv=csv: platformer.build(csv, game.TILE_SIZE), 20)
+
+    found["sprite/construct"] = (lambda: Sprite("fox.png", (0, 64, 32, 32), 8, game.color_key, 5), 200)
+    frame = game.fox_walk.images[0]
+    found["sprite/flip_h"] = (lambda: game.fox_walk._flip_h(frame), 5000)
+
+    # Representative pairs: a fox standing on a platform tile, a fox touching
+    # a pig, and a pair rejected by the bounding boxes
+    tile = game.platforms[0]
+    fox = SpriteActor(game.fox_idle)
+    fox.midbottom = (tile.x + 0.5, tile.top + 6)
+    pig = SpriteActor(game.pig_walk)
+    pig.topleft = (fox.left + 8, fox.top)
+    far = SpriteActor(game.pig_walk)
+    far.topleft = (fox.right + 100, fox.top)
+    found["collide/sprite_tile"] = (lambda: pixel_perfect_collide(fox, tile), 20000)
+    found["collide/sprite_sprite"] = (lambda: pixel_perfect_collide(fox, pig), 20000)
+    found["collide/aabb_reject"] = (lambda: pixel_perfect_collide(fox, far), 20000)
+
+    player = game.player
+
+    def player_update():
+        player.update(game.keyboard)
+    found["player/update"] = (player_update, 2000)
+
+    pig0 = game.pig_enemies[0]
+    found["pig/move"] = (pig0.move, 5000)
+
+    import swarm
+    if swarm.available:
+        # 10,000 patrollers spread over the level's platforms, stepped as arrays and synced the
+        # way a game tick reads them: the pigs in view (this level's view is the whole world)
+        # and the ones near the player
+        from enemy import PigEnemy
+        plats = game.platforms
+        crowd = [PigEnemy(game.pig_walk, game.pig_idle, plats[i % len(plats)], plats, game.TILE_SIZE,
+                          speed=game.PIG_SPEED) for i in range(10000)]
+        pigs = swarm.PatrolSwarm(crowd, game.pig_rng)
+
+        def swarm_tick():
+            pigs.step()
+            pigs.near(game.camera.view(game.VIEW_MARGIN))
+            pigs.near(game.player)
+        found["swarm/tick_10000"] = (swarm_tick, 20)
+
+    # 500 pigs in view plus the player, drawn the way a frame draws its actors
+    from enemy import PigEnemy
+    plats = game.platforms
+    crowd = [PigEnemy(game.pig_walk, game.pig_idle, plats[i % len(plats)], plats, game.TILE_SIZE,
+                      speed=game.PIG_SPEED) for i in range(500)]
+
+    def draw_crowd():
+        pigs = game.pig_enemies
+        game.pig_enemies = crowd
+        try:
+            game.draw_actors()
+        finally:
+            game.pig_enemies = pigs
+    found["render/actors_500"] = (draw_crowd, 200)
+
+    def frame_update_draw():
+        game.lives = game.MAX_LIVES  # keep the run alive and the HUD size constant
+        game.update(game.TICK)
+        game.draw()
+    found["frame/update_draw"] = (frame_update_draw, 200)
+
+    # The same frame pushed to the display: all of it, or only the dirty rects
+    import pygame
+
+    def frame_presented(dirty):
+        def frame():
+            was, game.DIRTY_RECT_RENDERING = game.DIRTY_RECT_RENDERING, dirty
+            try:
+                frame_update_draw()
+            finally:
+                game.DIRTY_RECT_RENDERING = was
+            if dirty:
+                game.dirty_renderer.present()
+            else:
+                pygame.display.flip()
+        return frame
+    found["frame/present_full"] = (frame_presented(False), 200)
+    found["frame/present_dirty"] = (frame_presented(True), 200)
+    return found
+
+
+def run(filter_text=None, repeat=5):
+    game = _setup()
+    # Start the level the way a player does, so update() runs real game logic
+    game.on_key_down(game.keys.RETURN)
+    results = {}
+    for name, (fn, number) in benchmarks(game).items():
+        if filter_text and filter_text not in name:
+            continue
+        game.reset_game()
+        game.game_state = "playing"
+        fn()  # warm caches before timing
+        results[name] = {"seconds": _time(fn, number, repeat), "number": number, "repeat": repeat}
+    import pygame
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """List of (name, baseline s, current s, change) for results slower than baseline by > threshold."""
+    regressions = []
+    base = baseline.get("results", {})
+    for name, res in current["results"].items():
+        if name not in base:
+            continue
+        old = base[name]["seconds"]
+        new = res["seconds"]
+        change = new / old - 1 if old else 0.0
+        if change > threshold:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+def _fmt(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.3f} ms"
+    return f"{seconds * 1e6:9.2f} us"
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the engine hot paths headless.")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="flag results slower than the baseline by more than this fraction (default 0.15)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    current = run(args.filter, args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    for name, res in current["results"].items():
+        line = f"{name:24} {_fmt(res['seconds'])}"
+        if baseline and name in baseline.get("results", {}):
+            old = baseline["results"][name]["seconds"]
+            line += f"   baseline {_fmt(old)}  {(res['seconds'] / old - 1) * 100:+6.1f}%"
+        print(line)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+    if baseline:
+        regressions = compare(current, baseline, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {_fmt(old).strip()} -> {_fmt(new).strip()} ({change * 100:+.1f}%)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Scrolling camera over a world that may be larger than the window."""
+from pygame import Rect
+
+
+class Camera(object):
+    """Viewport of view_size pixels over a world of world_size pixels.
+
+    x, y is the world position of the window's top-left corner, kept on
+    whole pixels so tiles don't shimmer while scrolling. Draw world objects
+    at their position plus offset.
+    """
+
+    def __init__(self, view_size, world_size):
+        self.width, self.height = view_size
+        self.world_w, self.world_h = world_size
+        self.x = 0
+        self.y = 0
+
+    @property
+    def offset(self):
+        return -self.x, -self.y
+
+    def follow(self, target):
+        """Center on target (anything with centerx/centery), without showing past the world edges."""
+        self.x = self._clamp(int(round(target.centerx - self.width / 2)), self.world_w - self.width)
+        self.y = self._clamp(int(round(target.centery - self.height / 2)), self.world_h - self.height)
+
+    @staticmethod
+    def _clamp(value, high):
+        return max(0, min(value, high))
+
+    def view(self, margin=0):
+        """Visible part of the world, grown by margin pixels on every side."""
+        return Rect(self.x - margin, self.y - margin, self.width + 2 * margin, self.height + 2 * margin)
+
+    def visible(self, obj, margin=0):
+        """True if obj (any left/top/right/bottom box) is within margin of the view."""
+        return (obj.right > self.x - margin and obj.left < self.x + self.width + margin
+                and obj.bottom > self.y - margin and obj.top < self.y + self.height + margin)
+
+    def to_screen(self, rect):
+        return Rect(rect).move(-self.x, -self.y)
@@ -1,37 +1,185 @@
+import contextlib
+import math
+import weakref
+from collections import deque
+
+import pygame
+
+from platformer import tiles_near
+
 _alpha_bbox_cache = {}
+# Collision bitmasks per (surface, inset, cut_x, cut_y); built once per surface
+_mask_cache = weakref.WeakKeyDictionary()
 
+# Counters, or None when off (every hot-path hook is a single `is not None` check)
+stats = None
 
-def _pixel_is_opaque(rgb_or_rgba):
-    try:
-        if len(rgb_or_rgba) == 4:
-            return rgb_or_rgba[3] >= 192  # avoid hits on anti-aliased halos
-        return tuple(rgb_or_rgba[:3]) != (0, 0, 0)
-    except Exception:
-        return True
+
+class CollisionStats(object):
+    """Collision counters per call site, kept per logic tick and in total.
+
+    game.step() closes a row with end_frame() after every tick, so sim.py and
+    bench runs get the same per-tick history as the window. pixels_covered
+    is the area of the box overlaps handed to a mask test, i.e. the pixels a
+    per-pixel scan would have had to sample.
+    """
+    FIELDS = ("pairs", "aabb_rejects", "bbox_rejects", "mask_tests", "hits", "pixels_covered",
+              "layer_queries", "bbox_cache_hits", "bbox_cache_misses", "fallbacks")
+
+    def __init__(self, history=240):
+        self.site = "other"
+        self.frame = {}   # site -> {field: count} for the frame in progress
+        self.totals = {}
+        self.frames = deque(maxlen=history)
+
+    def add(self, field, n=1):
+        counts = self.frame.get(self.site)
+        if counts is None:
+            counts = self.frame[self.site] = dict.fromkeys(self.FIELDS, 0)
+        counts[field] += n
+
+    def end_frame(self):
+        for site, counts in self.frame.items():
+            total = self.totals.get(site)
+            if total is None:
+                total = self.totals[site] = dict.fromkeys(self.FIELDS, 0)
+            for field, n in counts.items():
+                total[field] += n
+        self.frames.append(self.frame)
+        self.frame = {}
+
+    def report(self):
+        """Totals per site as a text table."""
+        sites = sorted(self.totals)
+        lines = ["%-18s" % "" + "".join("%12s" % s for s in sites)]
+        for field in self.FIELDS:
+            lines.append("%-18s" % field + "".join("%12d" % self.totals[s][field] for s in sites))
+        return "\n".join(lines)
+
+
+def enable_stats(history=240):
+    global stats
+    stats = CollisionStats(history)
+    return stats
+
+
+def disable_stats():
+    global stats
+    stats = None
+
+
+class _Site(object):
+    __slots__ = ("name", "prev")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.prev = stats.site
+        stats.site = self.name
+
+    def __exit__(self, *exc):
+        stats.site = self.prev
+        return False
+
+
+_NO_SITE = contextlib.nullcontext()
+
+
+def collision_site(name):
+    """Attribute the collision work done inside the with-block to site `name`."""
+    if stats is None:
+        return _NO_SITE
+    return _Site(name)
+
+
+def _build_mask(surf):
+    if surf.get_flags() & pygame.SRCALPHA:
+        # Bits are set where alpha > 191 (>= 192), so anti-aliased halos don't hit
+        return pygame.mask.from_surface(surf, 191)
+    # Without per-pixel alpha every pixel is solid (or all but the colorkey).
+    # platformer.display_format() only drops alpha from images that were fully
+    # opaque, so black pixels in them must stay solid too.
+    return pygame.mask.from_surface(surf)
+
+
+def alpha_bbox(surf):
+    """Local (x0, y0, x1, y1) bounds of the opaque pixels of surf, or None if it has none."""
+    sw, sh = surf.get_size()
+    key = (id(surf), sw, sh)
+    if key in _alpha_bbox_cache:
+        if stats is not None:
+            stats.add("bbox_cache_hits")
+        return _alpha_bbox_cache[key]
+    if stats is not None:
+        stats.add("bbox_cache_misses")
+    rects = surface_mask(surf).get_bounding_rects()
+    bbox = None
+    if rects:
+        r = rects[0].unionall(rects[1:])
+        bbox = (r.left, r.top, r.right, r.bottom)
+    _alpha_bbox_cache[key] = bbox
+    return bbox
+
+
+def surface_mask(surf, inset=(0, 0), cut_x=False, cut_y=False):
+    """Cached collision bitmask of surf.
+
+    inset clears a border of (ix, iy) pixels, as _inset_for does for pair tests.
+    cut_x/cut_y clear the last opaque column/row, which the pixel scan never
+    reaches when the owner sits at a fractional positive coordinate.
+    """
+    per_surf = _mask_cache.get(surf)
+    if per_surf is None:
+        per_surf = _mask_cache[surf] = {}
+    key = (inset, cut_x, cut_y)
+    m = per_surf.get(key)
+    if m is not None:
+        return m
+    if key == ((0, 0), False, False):
+        m = _build_mask(surf)
+    elif cut_x or cut_y:
+        m = surface_mask(surf, inset).copy()
+        x0, y0, x1, y1 = alpha_bbox(surf) or (0, 0, 0, 0)
+        mw, mh = m.get_size()
+        if cut_x and x1 > 0:
+            for yy in range(mh):
+                m.set_at((x1 - 1, yy), 0)
+        if cut_y and y1 > 0:
+            for xx in range(mw):
+                m.set_at((xx, y1 - 1), 0)
+    else:
+        m = surface_mask(surf).copy()
+        ix, iy = inset
+        mw, mh = m.get_size()
+        for yy in range(mh):
+            for xx in range(mw):
+                if xx < ix or yy < iy or xx >= mw - ix or yy >= mh - iy:
+                    m.set_at((xx, yy), 0)
+    per_surf[key] = m
+    return m
+
+
+def warm_masks(surfaces, insets=((0, 0),)):
+    """Build the collision masks for surfaces up front (call at load time)."""
+    for surf in surfaces:
+        if surf is None:
+            continue
+        alpha_bbox(surf)
+        for inset in insets:
+            surface_mask(surf, inset)
 
 
 def _collision_surface(obj):
-    # Prefer the actual frame drawn (cached by our SpriteActor/Actor)
-    surf = getattr(obj, "_surf", None)
-    if surf is not None:
-        return surf
-    # Fallback: try reconstructing from sprite state if available
+    # Animated actors collide with the frame of the current logic tick, not the
+    # one last drawn (_surf only advances in draw(), which headless runs and
+    # culled actors skip)
     try:
         if hasattr(obj, "sprite") and getattr(obj, "sprite", None):
-            using_left_list = getattr(obj, "flip_x", False) and bool(obj.sprite.images_left)
-            base_images = obj.sprite.images_left if using_left_list else obj.sprite.images
-            if base_images:
-                idx = getattr(obj.sprite, "i", 0) % len(base_images)
-                frame = base_images[idx]
-                if getattr(obj, "flip_x", False) and not using_left_list:
-                    try:
-                        frame = obj.sprite._flip_h(frame)
-                    except Exception:
-                        pass
-                return frame
+            return obj.current_frame()
     except Exception:
-        return None
-    return None
+        pass
+    return getattr(obj, "_surf", None)
 
 
 def _inset_for(obj):
@@ -43,13 +191,26 @@ def _inset_for(obj):
     return (1, 1)
 
 
+def _placement(pos, bbox_end):
+    # The pixel scan samples int(x - pos) for integer world x, which is
+    # x - ceil(pos) once the inset test has passed. A positive fractional
+    # pos also truncates the bbox bound, dropping the last opaque column/row.
+    origin = math.ceil(pos)
+    cut = origin != pos and pos + bbox_end > 0
+    return origin, cut
+
+
 def _pixel_perfect_collide(a, b, inset_getter):
+    if stats is not None:
+        stats.add("pairs")
     # Quick AABB reject
     left = int(max(a.left, b.left))
     top = int(max(a.top, b.top))
     right = int(min(a.right, b.right))
     bottom = int(min(a.bottom, b.bottom))
     if left >= right or top >= bottom:
+        if stats is not None:
+            stats.add("aabb_rejects")
         return False
 
     try:
@@ -57,83 +218,146 @@ def _pixel_perfect_collide(a, b, inset_getter):
         sb = _collision_surface(b)
         if sa is None or sb is None:
             return a.colliderect(b)
-        aw, ah = sa.get_size()
-        bw, bh = sb.get_size()
-
-        # Prefilter by alpha bounding boxes to avoid scanning transparent halos
-        def alpha_bbox(surf):
-            # Tiny cache keyed by (id, size) to avoid recomputation within a frame
-            sw, sh = surf.get_size()
-            key = (id(surf), sw, sh)
-            cached = _alpha_bbox_cache.get(key)
-            if cached is not None:
-                return cached
-            minx, miny, maxx, maxy = sw, sh, -1, -1
-            for yy in range(sh):
-                for xx in range(sw):
-                    c = surf.get_at((xx, yy))
-                    if _pixel_is_opaque(c):
-                        if xx < minx:
-                            minx = xx
-                        if yy < miny:
-                            miny = yy
-                        if xx > maxx:
-                            maxx = xx
-                        if yy > maxy:
-                            maxy = yy
-            if maxx == -1:
-                _alpha_bbox_cache[key] = None
-                return None
-            bbox = (minx, miny, maxx + 1, maxy + 1)
-            _alpha_bbox_cache[key] = bbox
-            return bbox
 
         bb_a = alpha_bbox(sa)
         bb_b = alpha_bbox(sb)
         if bb_a is None or bb_b is None:
+            if stats is not None:
+                stats.add("bbox_rejects")
             return False
 
-        # Convert local alpha bboxes to world coords
-        a_lx0, a_ly0, a_lx1, a_ly1 = bb_a
-        b_lx0, b_ly0, b_lx1, b_ly1 = bb_b
-        a_wx0, a_wy0, a_wx1, a_wy1 = a.left + a_lx0, a.top + a_ly0, a.left + a_lx1, a.top + a_ly1
-        b_wx0, b_wy0, b_wx1, b_wy1 = b.left + b_lx0, b.top + b_ly0, b.left + b_lx1, b.top + b_ly1
-
-        # Intersect refined bounds
-        left = max(left, int(max(a_wx0, b_wx0)))
-        top = max(top, int(max(a_wy0, b_wy0)))
-        right = min(right, int(min(a_wx1, b_wx1)))
-        bottom = min(bottom, int(min(a_wy1, b_wy1)))
-        if left >= right or top >= bottom:
+        ax0, a_cut_x = _placement(a.left, bb_a[2])
+        ay0, a_cut_y = _placement(a.top, bb_a[3])
+        bx0, b_cut_x = _placement(b.left, bb_b[2])
+        by0, b_cut_y = _placement(b.top, bb_b[3])
+        # Opaque bounds in world space: disjoint means no mask bits can meet
+        if (ax0 + bb_a[2] <= bx0 + bb_b[0] or bx0 + bb_b[2] <= ax0 + bb_a[0]
+                or ay0 + bb_a[3] <= by0 + bb_b[1] or by0 + bb_b[3] <= ay0 + bb_a[1]):
+            if stats is not None:
+                stats.add("bbox_rejects")
             return False
-
-        aix, aiy = inset_getter(a)
-        bix, biy = inset_getter(b)
-        for y in range(top, bottom):
-            ay = y - a.top
-            by = y - b.top
-            for x in range(left, right):
-                ax = x - a.left
-                bx = x - b.left
-                if ax < aix or ay < aiy or ax >= aw - aix or ay >= ah - aiy:
-                    continue
-                if bx < bix or by < biy or bx >= bw - bix or by >= bh - biy:
-                    continue
-                iax = int(ax)
-                iay = int(ay)
-                ibx = int(bx)
-                iby = int(by)
-                if iax < 0 or iay < 0 or iax >= aw or iay >= ah:
-                    continue
-                if ibx < 0 or iby < 0 or ibx >= bw or iby >= bh:
-                    continue
-                ca = sa.get_at((iax, iay))
-                cb = sb.get_at((ibx, iby))
-                if _pixel_is_opaque(ca) and _pixel_is_opaque(cb):
-                    return True
+        ma = surface_mask(sa, tuple(inset_getter(a)), a_cut_x, a_cut_y)
+        mb = surface_mask(sb, tuple(inset_getter(b)), b_cut_x, b_cut_y)
+        hit = ma.overlap(mb, (bx0 - ax0, by0 - ay0)) is not None
+        if stats is not None:
+            stats.add("mask_tests")
+            stats.add("pixels_covered", (right - left) * (bottom - top))
+            if hit:
+                stats.add("hits")
+        return hit
     except Exception:
+        if stats is not None:
+            stats.add("fallbacks")
         return a.colliderect(b)
-    return False
+
+
+def _bake(tiles):
+    placed = []
+    for tile in tiles:
+        surf = _collision_surface(tile)
+        bbox = alpha_bbox(surf) if surf is not None else None
+        if bbox is None:
+            continue
+        tx, cut_x = _placement(tile.left, bbox[2])
+        ty, cut_y = _placement(tile.top, bbox[3])
+        placed.append((surface_mask(surf, tuple(_inset_for(tile)), cut_x, cut_y), tx, ty))
+    if not placed:
+        return None
+    ox = min(tx for _, tx, _ in placed)
+    oy = min(ty for _, _, ty in placed)
+    w = max(tx + m.get_size()[0] for m, tx, _ in placed) - ox
+    h = max(ty + m.get_size()[1] for m, _, ty in placed) - oy
+    world = pygame.mask.Mask((w, h))
+    for m, tx, ty in placed:
+        world.draw(m, (tx - ox, ty - oy))
+    return world, ox, oy
+
+
+def layer_mask(layer):
+    """One mask covering every tile of a static layer, with each tile's inset applied.
+
+    Returns (mask, origin_x, origin_y), or None for an empty layer. Rebuilt
+    automatically when the layer's version (or length, for plain lists) changes.
+    """
+    key = (getattr(layer, "version", None), len(layer))
+    cached = getattr(layer, "_baked_mask", None)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    baked = _bake(layer)
+    try:
+        layer._baked_mask = (key, baked)
+    except AttributeError:
+        pass  # plain lists take no attributes; bake again next call
+    return baked
+
+
+def chunk_mask(layer, key):
+    """layer_mask() of one resident chunk of a streamed layer (streaming.ChunkedLayer).
+
+    Rebuilt only when that chunk changes, so loading or dropping other
+    chunks costs no baking.
+    """
+    version = layer.chunk_versions[key]
+    cache = getattr(layer, "_baked_chunks", None)
+    if cache is None:
+        cache = layer._baked_chunks = {}
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    if len(cache) > 2 * len(layer.chunk_versions):
+        for gone in [k for k in cache if k not in layer.chunk_versions]:
+            del cache[gone]
+    baked = _bake(layer.chunk_tiles(key))
+    cache[key] = (version, baked)
+    return baked
+
+
+def _layer_masks(layer, a):
+    if hasattr(layer, "chunk_versions"):
+        return [baked for baked in (chunk_mask(layer, key) for key in layer.chunks_near(a)) if baked is not None]
+    baked = layer_mask(layer)
+    return [baked] if baked is not None else []
+
+
+def any_hit_layer(a, layer):
+    """any_hit_pixel(a, layer) for a static tile layer, as one query on its baked mask.
+
+    Streamed layers are baked per chunk; only the chunks around a are queried.
+    """
+    if stats is not None:
+        stats.add("layer_queries")
+    bakes = _layer_masks(layer, a)
+    if not bakes:
+        return False
+    try:
+        sa = _collision_surface(a)
+        if sa is None:
+            return first_hit_aabb(a, layer) is not None
+        bb = alpha_bbox(sa)
+        if bb is None:
+            return False
+        ax0, cut_x = _placement(a.left, bb[2])
+        ay0, cut_y = _placement(a.top, bb[3])
+        ma = surface_mask(sa, tuple(_inset_for(a)), cut_x, cut_y)
+        mw, mh = ma.get_size()
+        for world, ox, oy in bakes:
+            hit = world.overlap(ma, (ax0 - ox, ay0 - oy)) is not None
+            if stats is not None:
+                # Overlap of the actor's mask with the layer's, as for a pair test
+                ww, wh = world.get_size()
+                w = min(ax0 + mw, ox + ww) - max(ax0, ox)
+                h = min(ay0 + mh, oy + wh) - max(ay0, oy)
+                stats.add("mask_tests")
+                stats.add("pixels_covered", max(0, w) * max(0, h))
+                if hit:
+                    stats.add("hits")
+            if hit:
+                return True
+        return False
+    except Exception:
+        if stats is not None:
+            stats.add("fallbacks")
+        return any_hit_pixel(a, layer)
 
 
 def pixel_perfect_collide(a, b):
@@ -151,7 +375,7 @@ def platform_collide(a, b):
 # Convenience helpers for groups
 def first_hit_pixel(a, items):
     """Return the first item from items that collides with a using pixel-perfect check, else None."""
-    for it in items:
+    for it in tiles_near(items, a):
         if pixel_perfect_collide(a, it):
             return it
     return None
@@ -164,7 +388,7 @@ def any_hit_pixel(a, items):
 
 def first_hit_platform(a, platforms):
     """Return the first platform that collides with a using platform_collide, else None."""
-    for p in platforms:
+    for p in tiles_near(platforms, a):
         if platform_collide(a, p):
             return p
     return None
@@ -172,7 +396,7 @@ def first_hit_platform(a, platforms):
 
 def first_hit_aabb(a, items):
     """Return the first AABB (colliderect) hit item, else None."""
-    for it in items:
+    for it in tiles_near(items, a):
         if a.colliderect(it):
             return it
     return None
@@ -1,5 +1,13 @@
 import random
-from platformer import SpriteActor
+from platformer import SpriteActor, run_of
+from timing import ticks
+
+PAUSE_MIN_SECONDS = 1.0
+PAUSE_MAX_SECONDS = 3.0
+PAUSE_CHANCE = 0.007  # per walking tick, while no pause point is set
+
+# Pig AI randomness, kept apart from the global random module so a seed replays exactly
+rng = random.Random()
 
 class PigEnemy(SpriteActor):
     def __init__(self, walk_sprite, idle_sprite, platform, platforms, tile_size, speed=1.0):
@@ -12,24 +20,20 @@ class PigEnemy(SpriteActor):
         self.flip_x = False
         self.state = "walk"  # walk | idle
         self.pause_point = None
-        self.pause_timer = 0   # frames
+        self.pause_timer = 0   # logic ticks
         self.dir_sign = 1      # 1 right, -1 left
         self._platforms = platforms
         self._tile_size = tile_size
         # position on top of platform
         self.x = platform.x + platform.width // 2
         self.y = platform.y - platform.height // 2 - self.height // 2
-        # Determine patrol bounds across contiguous tiles
-        self.left_bound, self.right_bound = self._compute_patrol_bounds(platform)
+        # The run of contiguous tiles the pig patrols; its feet never leave it
+        self.run = run_of(platforms, platform)
+        self.left_bound, self.right_bound = self._compute_patrol_bounds(self.run)
 
-    def _compute_patrol_bounds(self, start_platform):
-        lookup = {(plat.x, plat.y): plat for plat in self._platforms}
-        left_plat = start_platform
-        while (left_plat.x - self._tile_size, left_plat.y) in lookup:
-            left_plat = lookup[(left_plat.x - self._tile_size, left_plat.y)]
-        right_plat = start_platform
-        while (right_plat.x + self._tile_size, right_plat.y) in lookup:
-            right_plat = lookup[(right_plat.x + self._tile_size, right_plat.y)]
+    def _compute_patrol_bounds(self, run):
+        left_plat = run.first
+        right_plat = run.last
         left_bound = left_plat.x - (left_plat.width // 2) + (self.width // 2)
         right_bound = right_plat.x + (right_plat.width // 2) - (self.width // 2)
         return left_bound, right_bound
@@ -56,11 +60,8 @@ class PigEnemy(SpriteActor):
             foot_x = self.x + self.width // 2
             foot_y = self.y + self.height // 2 + 2
 
-        on_platform = False
-        for plat in self._platforms:
-            if plat.collidepoint((foot_x, foot_y)):
-                on_platform = True
-                break
+        # Runs are maximal and pigs stay in theirs, so leaving the run means leaving the ground
+        on_platform = self.run.contains((foot_x, foot_y))
 
         if not on_platform:
             self.velocity_x *= -1
@@ -82,17 +83,17 @@ class PigEnemy(SpriteActor):
             self.pause_point = None
 
         # Random pause
-        if self.pause_point is None and random.random() < 0.007:
+        if self.pause_point is None and rng.random() < PAUSE_CHANCE:
             left = int(self.left_bound + 2)
             right = int(self.right_bound - 2)
             if right >= left:
-                self.pause_point = random.randint(left, right)
+                self.pause_point = rng.randint(left, right)
 
         if self.pause_point is not None:
             if (self.velocity_x > 0 and self.x >= self.pause_point) or (self.velocity_x < 0 and self.x <= self.pause_point):
                 self.state = "idle"
                 self.sprite = self.idle_sprite
                 self.dir_sign = 1 if self.velocity_x > 0 else -1
-                self.velocity_x = 0
-                self.pause_timer = random.randint(60, 180)
+                self.velocity_x = 0.0
+                self.pause_timer = rng.randint(ticks(PAUSE_MIN_SECONDS), ticks(PAUSE_MAX_SECONDS))
                 self.flip_x = True if self.dir_sign < 0 else False
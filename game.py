@@ -1,13 +1,26 @@
+import os
+import sys
+import atexit
 import pgzrun
 import random
-from platformer import build, Sprite, SpriteActor
-from pgzero import loaders
-from collisions import pixel_perfect_collide, platform_collide, first_hit_pixel, any_hit_pixel, first_hit_aabb
+from platformer import build_layer, TileSet, Sprite, tiles_near, animation_clock
+import collisions
+from collisions import any_hit_pixel, first_hit_aabb, warm_masks, any_hit_layer, collision_site
 from pygame import Rect
-from enemy import PigEnemy
+from enemy import PigEnemy, rng as pig_rng
+import swarm
 from typing import Any
 from player import Player
 import menu as menu_mod
+from levelcache import load_level
+from render import StaticLayerCache, DirtyRectRenderer, RenderQueue
+from camera import Camera
+from streaming import ChunkStreamer
+from hud import text_cache, heart_sprite, CachedLayer
+from background import Backdrop
+from timing import TICK, ticks, FixedTimestep, Interpolator
+from replay import Recorder
+from profiler import PhaseProfiler
 
 # PgZero injects these globals at runtime: screen, music, sounds, keys, keyboard.
 screen: Any
@@ -28,13 +41,43 @@ WIDTH = TILE_SIZE * ROWS
 HEIGHT = TILE_SIZE * COLS
 TITLE = " "
 
- # World
-platforms = build("platformer_platformer.csv", TILE_SIZE)
-obstacles = build("platformer_obstacles.csv", TILE_SIZE)
-coins = build("platformer_coins.csv", TILE_SIZE)
-scenery = build("platformer_cenario.csv", TILE_SIZE)
-
-total_coins = len(coins)
+ # World (every TMX layer compiled once into a memory-mapped binary cache)
+LEVEL_SOURCE = "platformer.tmx"
+LEVEL_CACHE = "platformer.level"
+level = load_level(LEVEL_SOURCE, LEVEL_CACHE)
+WORLD_WIDTH = level.cols * TILE_SIZE
+WORLD_HEIGHT = level.rows * TILE_SIZE
+
+# The window scrolls over the level, following the player; only what is in view
+# (plus a margin) gets drawn
+camera = Camera((WIDTH, HEIGHT), (WORLD_WIDTH, WORLD_HEIGHT))
+VIEW_MARGIN = TILE_SIZE * 2
+
+# Levels with more cells than this are streamed: only the chunks around the camera
+# exist as tiles (loaded on a worker thread, least recently used dropped past the budget)
+STREAM_MIN_CELLS = 128 * 128
+STREAM_MAX_CHUNKS = 64
+streamer = None
+if level.rows * level.cols >= STREAM_MIN_CELLS:
+    streamer = ChunkStreamer(level, ("platformer", "obstacles", "coins", "cenario"), TILE_SIZE, camera,
+                             max_chunks=STREAM_MAX_CHUNKS)
+    atexit.register(streamer.close)
+    platforms = streamer.layer("platformer")
+    obstacles = streamer.layer("obstacles")
+    coins = streamer.layer("coins")
+    scenery = streamer.layer("cenario")
+else:
+    platforms = build_layer(level.layer("platformer"), level.cols, TILE_SIZE)
+    obstacles = build_layer(level.layer("obstacles"), level.cols, TILE_SIZE)
+    # Coins are picked up and put back on every restart: keep them in a set and snapshot the full level
+    coins = TileSet(build_layer(level.layer("coins"), level.cols, TILE_SIZE), TILE_SIZE)
+    scenery = build_layer(level.layer("cenario"), level.cols, TILE_SIZE)
+coins.snapshot()
+
+# Sky, platforms, obstacles and scenery never move: composite them once
+static_layers = StaticLayerCache((WIDTH, HEIGHT), (platforms, obstacles, scenery), camera=camera)
+
+total_coins = level.count("coins")
 coins_collected = 0
 
 HUD_Y = 10
@@ -43,13 +86,20 @@ HEART_EXTRA_PADDING = 14
 COIN_SOUND_VOLUME = 0.25
 GAMEOVER_Y_OFFSET = 40
 WIN_Y_OFFSET = 40
+HUD_RECT = Rect(0, 0, WIDTH, HUD_Y + 50)
+
+# Opt-in: while playing, repaint only the regions that changed instead of the whole scene
+DIRTY_RECT_RENDERING = False
+dirty_renderer = DirtyRectRenderer(static_layers, hud_rect=HUD_RECT)
 
 # Lives
 MAX_LIVES = 3
 lives = MAX_LIVES
-INVULN_FRAMES = 90  # ~1.5s at 60 FPS
-invuln_timer = 0
-SPAWN_BOTTOMLEFT = (0, HEIGHT - TILE_SIZE)
+INVULN_SECONDS = 1.5
+INVULN_TICKS = ticks(INVULN_SECONDS)
+BLINK_TICKS = ticks(1 / 12)  # invulnerability blink half-period
+invuln_timer = 0  # logic ticks left
+SPAWN_BOTTOMLEFT = (0, WORLD_HEIGHT - TILE_SIZE)
 
 color_key = (0, 0, 0)
 # As retângulos left_rect assumem que a spritesheet possui uma linha espelhada do mesmo tamanho
@@ -59,12 +109,24 @@ fox_idle = Sprite("fox.png", (0, 32, 32, 32), 14, color_key, 30)
 pig_walk = Sprite("pig.png", (0, 0, 32, 32), 5, color_key, 30, left_rect=(0, 0, 32, 32))
 pig_idle = Sprite("pig.png", (0, 32, 32, 32), 5, color_key, 30, left_rect=(0, 32, 32, 32))
 
-player = Player(fox_idle, fox_walk, WIDTH, HEIGHT, platforms, obstacles, gravity=1, speed=3, jump_velocity=-13)
-player.bottomleft = (0, HEIGHT - TILE_SIZE)
+# Collision bitmasks for every sprite frame (both facings) and tile surface, built once at load
+# (streamed tiles build theirs on first use)
+warm_masks([f for s in (fox_walk, fox_idle, pig_walk, pig_idle) for f in s.images + s.images_left],
+           insets=((0, 0), (4, 3)))
+warm_masks({id(t._surf): t._surf for layer in (platforms, obstacles, coins, scenery) for t in layer}.values(),
+           insets=((0, 0), (1, 1)))
+
+player = Player(fox_idle, fox_walk, WORLD_WIDTH, WORLD_HEIGHT, platforms, obstacles, gravity=1, speed=3, jump_velocity=-13)
+player.bottomleft = SPAWN_BOTTOMLEFT
 player.alive = True
 player.scale = 1
 player.sprite = fox_idle
 
+if streamer is not None:
+    # The spawn area is loaded before the first frame; the rest streams in behind it
+    camera.follow(player)
+    streamer.load_now()
+
  # Game state variables
 gravity = 1
 jump_velocity = -13
@@ -74,6 +136,7 @@ game_state = "menu"  # "menu" or "playing"
 music_on = True
 sound_on = True
 game_paused = False  # pausa do jogo
+enemies_paused = False  # last pause state pushed to the enemies
 
 PIG_SPEED = 0.6
 
@@ -81,88 +144,160 @@ timer_seconds = 500
 timer = timer_seconds
 timer_active = False
 
-# Create pig enemies on specific platforms
-pig_platform_indices = [3, 4, 29, 68, 91, 147]
+# Create pig enemies on specific platform tiles, by (col, row)
+# (pigs on chunks that aren't loaded stay frozen until they are)
+pig_platform_cells = [(13, 6), (22, 6), (48, 12), (30, 16), (35, 22), (34, 29)]
 pig_enemies = []
-for idx in pig_platform_indices:
-    plat = platforms[idx]
+for cell in pig_platform_cells:
+    plat = platforms.tile_at(*cell)
     pig = PigEnemy(pig_walk, pig_idle, plat, platforms, TILE_SIZE, speed=PIG_SPEED)
     pig_enemies.append(pig)
 
 enemies = pig_enemies
-
-def draw_background():
-    try:
-        sky = loaders.images.load("sky")
-        sw, sh = sky.get_size()
-        # Azuleja a imagem para cobrir a tela toda
-        for y in range(0, HEIGHT, sh):
-            for x in range(0, WIDTH, sw):
-                screen.blit("sky", (x, y))
-    except Exception:
-        # Fallback caso a imagem não exista
-        screen.fill("skyblue")
-
-def draw_heart(x, y, size=20, color="red"):
-    # Coração pixelado (8x7) escalável
-    pattern = [
-        "01100110",
-        "11111111",
-        "11111111",
-        "11111111",
-        "01111110",
-        "00111100",
-        "00011000",
-    ]
-    scale = max(1, int(size / 8))
-    for row, line in enumerate(pattern):
-        for col, ch in enumerate(line):
-            if ch == '1':
-                rx = x + col * scale
-                ry = y + row * scale
-                screen.draw.filled_rect(Rect((rx, ry), (scale, scale)), color)
-
-def draw_hud():
+# Large pig counts are stepped together as numpy arrays, with the PigEnemy objects as views;
+# below SWARM_MIN_PIGS the per-object loop is cheaper than the array overhead
+SWARM_MIN_PIGS = 64
+pig_swarm = None
+if swarm.available and len(pig_enemies) >= SWARM_MIN_PIGS:
+    pig_swarm = swarm.PatrolSwarm(pig_enemies, pig_rng)
+
+# Reproducible runs: FOX_SEED fixes the pig AI, FOX_RECORD=<file> records the session for replay.py
+GAME_SEED = int(os.environ.get("FOX_SEED", random.randrange(2 ** 32)))
+pig_rng.seed(GAME_SEED)
+recorder = None
+if os.environ.get("FOX_RECORD"):
+    recorder = Recorder(GAME_SEED)
+    atexit.register(recorder.save, os.environ["FOX_RECORD"])
+
+# Phase timings: F3 toggles the overlay, F4 dumps the last frames; FOX_PROFILE=1 records from the start
+profiler = PhaseProfiler(record=bool(os.environ.get("FOX_PROFILE")))
+PROFILE_DUMP = "profile"
+# FOX_COLLISION_STATS=1 counts collision work per call site (F4 dumps it with the profile)
+if os.environ.get("FOX_COLLISION_STATS"):
+    collisions.enable_stats()
+
+# Logic runs at a fixed tick rate; draw() interpolates between the last two ticks
+stepper = FixedTimestep()
+interpolator = Interpolator(snap_distance=TILE_SIZE * 2)
+
+def _hud_blits(coins_collected, total_coins, lives, seconds):
     coin_text = f"{coins_collected}/{total_coins}"
     COIN_FONT_SIZE = 40
-    screen.draw.text(coin_text, (30, HUD_Y), fontsize=COIN_FONT_SIZE, color="yellow")
+    blits = [text_cache.place(coin_text, COIN_FONT_SIZE, "yellow", topleft=(30, HUD_Y))]
     est_char_w = int(0.6 * COIN_FONT_SIZE)
     hearts_start_x = 30 + len(coin_text) * est_char_w + HEART_EXTRA_PADDING
-    heart_scale = max(1, int(HEART_SIZE / 8))
-    heart_width = 8 * heart_scale
-    heart_gap = max(4, heart_scale)
+    heart = heart_sprite(HEART_SIZE, "red")
+    heart_width = heart.get_width()
+    heart_gap = max(4, heart_width // 8)
     for i in range(lives):
-        draw_heart(hearts_start_x + i * (heart_width + heart_gap), HUD_Y - 2, size=HEART_SIZE, color="red")
-    screen.draw.text("Press P to pause", center=(WIDTH/2, 20), fontsize=28, color="white")
-    timer_text = f"Tempo: {int(timer)}s"
-    screen.draw.text(timer_text, (WIDTH - 200, HUD_Y), fontsize=40, color="black")
+        blits.append((heart, (hearts_start_x + i * (heart_width + heart_gap), HUD_Y - 2)))
+    blits.append(text_cache.place("Press P to pause", 28, "white", center=(WIDTH/2, 20)))
+    timer_text = f"Tempo: {seconds}s"
+    blits.append(text_cache.place(timer_text, 40, "black", topleft=(WIDTH - 200, HUD_Y)))
+    return blits
+
+# The HUD only changes with the coins, lives or whole seconds shown
+hud_layer = CachedLayer(_hud_blits)
+
+def draw_hud():
+    hud_layer.draw(screen.surface, (coins_collected, total_coins, lives, int(timer)))
+
+# Sprites are queued per layer and drawn with one Surface.blits() call each
+render_queue = RenderQueue(("coins", "scenery", "pigs", "player"))
+
+def draw_coins(items):
+    offset = camera.offset
+    queue = render_queue
+    for coin in items:
+        queue.add("coins", coin.blit_item(offset))
+    # Scenery is drawn above coins; repaint the few scenery tiles sharing a coin's cell
+    for coin in items:
+        for scene in tiles_near(scenery, coin):
+            if coin.colliderect(scene):
+                queue.add("scenery", scene.blit_item(offset))
+    queue.flush(screen.surface)
+
+def visible_pigs():
+    """The pigs overlapping the view; swarm views are synced only for these."""
+    view = camera.view(VIEW_MARGIN)
+    if pig_swarm is not None:
+        return pig_swarm.near(view)
+    return [pig for pig in pig_enemies if pig.overlaps(view)]
+
+def draw_actors(pigs=None):
+    offset = camera.offset
+    queue = render_queue
+    for pig in visible_pigs() if pigs is None else pigs:
+        queue.add("pigs", pig.blit_item(offset))
+    if player.alive:
+        # Blink while invulnerable to give feedback
+        if invuln_timer <= 0 or ((invuln_timer // BLINK_TICKS) % 2 == 0):
+            queue.add("player", player.blit_item(offset))
+    queue.flush(screen.surface)
+
+def draw_dirty(pigs):
+    surf = screen.surface
+    moving = pigs + [player]
+    with profiler.phase("draw_static"):
+        rects = dirty_renderer.begin(surf, moving, hud_key=(coins_collected, lives, int(timer)),
+                                     offset=camera.offset)
+    with profiler.phase("draw_coins"):
+        if rects is None:
+            draw_coins(tiles_near(coins, camera.view(VIEW_MARGIN)))
+        else:
+            for r in rects:
+                surf.set_clip(r)
+                draw_coins(tiles_near(coins, r.move(camera.x, camera.y)))
+            surf.set_clip(None)
+    with profiler.phase("draw_actors"):
+        draw_actors(pigs)
+    if rects is None or dirty_renderer.hud_dirty():
+        with profiler.phase("draw_hud"):
+            draw_hud()
+    dirty_renderer.end(moving, camera.offset)
 
 def draw():
+    # Show actors where they'd be at this instant between two logic ticks
+    if game_state != "playing":
+        camera.follow(player)
+        draw_frame([])
+        return
+    saved = interpolator.blend([player], stepper.alpha)
+    camera.follow(player)
+    try:
+        # Pigs are culled against the view that follows the blended player
+        pigs = visible_pigs()
+        saved += interpolator.blend(pigs, stepper.alpha)
+        draw_frame(pigs)
+    finally:
+        interpolator.restore(saved)
+
+def draw_frame(pigs):
+    # The overlay isn't tracked by the dirty-rect renderer, so it forces full frames
+    if DIRTY_RECT_RENDERING and game_state == "playing" and not (game_over or game_win) and not profiler.overlay:
+        draw_dirty(pigs)
+        return
+    dirty_renderer.invalidate()
     screen.clear()
     if game_state == "menu":
-        draw_menu()
+        with profiler.phase("draw_menu"):
+            draw_menu()
     else:
-        # Background image (tiling + fallback)
-        draw_background()
-        for i, platform in enumerate(platforms):
-            platform.draw()
-        for obstacle in obstacles:
-            obstacle.draw()
-        for coin in coins:
-            coin.draw()
-        for scene in scenery:
-            scene.draw()
-        for pig in pig_enemies:
-            pig.draw()
-        if player.alive:
-            # Blink while invulnerable to give feedback
-            if invuln_timer <= 0 or ((invuln_timer // 5) % 2 == 0):
-                player.draw()
-        draw_hud()
+        # Sky + static layers come from one cached surface
+        with profiler.phase("draw_static"):
+            static_layers.draw(screen)
+        with profiler.phase("draw_coins"):
+            draw_coins(tiles_near(coins, camera.view(VIEW_MARGIN)))
+        with profiler.phase("draw_actors"):
+            draw_actors(pigs)
+        with profiler.phase("draw_hud"):
+            draw_hud()
         if game_over:
             draw_gameover_screen()
         if game_win:
             draw_win_screen()
+    if profiler.overlay:
+        profiler.draw_overlay(screen, (WIDTH - 260, HUD_Y + 50))
 
 def draw_menu():
     menu_mod.draw_menu(screen, WIDTH, music_on=music_on, sound_on=sound_on)
@@ -170,15 +305,14 @@ def draw_menu():
 def draw_gameover_menu():
     draw_gameover_screen()
 
+_fullscreen_backdrops = {}
+
 def _draw_fullscreen_image(key: str):
-    try:
-        surf = loaders.images.load(key)
-        sw, sh = surf.get_size()
-        x = (WIDTH - sw) // 2
-        y = (HEIGHT - sh) // 2
-        screen.blit(surf, (x, y))
-    except Exception:
-        screen.fill("black")
+    # Centred (black if the image is missing), built once per image into a single blit
+    backdrop = _fullscreen_backdrops.get(key)
+    if backdrop is None:
+        backdrop = _fullscreen_backdrops[key] = Backdrop(key, tile=False)
+    backdrop.draw(screen.surface)
 
 def draw_gameover_screen():
     menu_mod.draw_gameover_screen(screen, WIDTH, HEIGHT)
@@ -220,7 +354,7 @@ def lose_life_and_respawn():
     player.velocity_y = 0
     player.jumping = False
     player.sprite = fox_idle
-    invuln_timer = INVULN_FRAMES
+    invuln_timer = INVULN_TICKS
 
 def warp_to_spawn_no_penalty():
     """Teleport the player back to spawn without losing a life (used during invulnerability)."""
@@ -230,14 +364,38 @@ def warp_to_spawn_no_penalty():
     player.jumping = False
     player.sprite = fox_idle
 
-def update():
-    global game_over, game_win, timer, timer_active, coins_collected, invuln_timer, game_paused
+def update(dt):
+    profiler.begin_frame()
+    if streamer is not None:
+        with profiler.phase("streaming"):
+            streamer.update()
+            streamer.ensure(player)
+    # pgzero passes the real frame time; run as many fixed logic ticks as it covers
+    for _ in range(stepper.advance(dt)):
+        interpolator.capture(visible_pigs() + [player])
+        step()
+
+def step():
+    """Advance the game logic by exactly one tick (TICK seconds)."""
+    if recorder is not None:
+        recorder.before_step(keyboard)
+    _step()
+    if collisions.stats is not None:
+        collisions.stats.end_frame()
+    if recorder is not None:
+        recorder.after_step(sys.modules[__name__])
+
+def _step():
+    global game_over, game_win, timer, timer_active, coins_collected, invuln_timer, game_paused, enemies_paused
 
     if game_state == "menu":
         start_menu_music()
         timer_active = False
         return
 
+    # One animation tick per update; actors flagged paused below stay frozen
+    animation_clock.advance()
+
     if game_over or not player.alive:
         timer_active = False
         return
@@ -247,15 +405,23 @@ def update():
 
     # Aplicar estado de pausa nas sprites (congela animação)
     player.paused = game_paused
-    for enemy in enemies:
-        enemy.paused = game_paused
+    if enemies_paused != game_paused:
+        enemies_paused = game_paused
+        for enemy in enemies:
+            enemy.paused = game_paused
 
     # Se pausado, não atualiza lógica de jogo
     if game_paused:
         return
 
-    for enemy in enemies:
-        enemy.move()
+    with profiler.phase("enemies"):
+        if pig_swarm is not None:
+            # Views are synced where they're read: near() for the hit test and the drawn pigs
+            pig_swarm.step(None if streamer is None else pig_swarm.in_chunks(streamer.loaded, streamer.chunk_px))
+        else:
+            for enemy in enemies:
+                if streamer is None or streamer.is_loaded(enemy):
+                    enemy.move()
 
     # Invulnerability timer countdown after respawn
     if invuln_timer > 0:
@@ -265,7 +431,7 @@ def update():
     if not timer_active:
         timer_active = True
     if timer_active:
-        timer -= 1/60  # update é chamado ~60 vezes por segundo
+        timer -= TICK
         if timer <= 0:
             timer = 0
             game_over = True
@@ -275,11 +441,14 @@ def update():
                 sounds.gameover.play()
 
     # Delegate movement and gravity to Player
-    player.update(keyboard)
+    with profiler.phase("player"):
+        player.update(keyboard)
 
     # Collision with obstacles (spikes/lava) pixel-perfect
     # If invulnerable, warp back to spawn without losing life to avoid falling into void.
-    if any_hit_pixel(player, obstacles):
+    with profiler.phase("hit_obstacles"), collision_site("obstacles"):
+        hit_obstacle = any_hit_layer(player, obstacles)
+    if hit_obstacle:
         if invuln_timer <= 0:
             if sound_on:
                 sounds.hero_hurt.play()
@@ -289,18 +458,22 @@ def update():
 
     # Collision with enemies -> pixel-perfect -> lose a life and respawn
     if invuln_timer <= 0 and player.alive:
-        if any_hit_pixel(player, enemies):
+        with profiler.phase("hit_enemies"), collision_site("enemies"):
+            hit_enemy = any_hit_pixel(player, pig_swarm.near(player) if pig_swarm is not None else enemies)
+        if hit_enemy:
             if sound_on:
                 sounds.hero_hurt.play()
             lose_life_and_respawn()
 
     # Collision with coins
-    hit_coin = first_hit_aabb(player, coins)
+    with profiler.phase("hit_coins"), collision_site("coins"):
+        hit_coin = first_hit_aabb(player, coins)
     if hit_coin:
         try:
             coins.remove(hit_coin)
         except Exception:
             pass
+        dirty_renderer.mark_dirty(Rect(hit_coin.topleft, hit_coin.size).move(camera.offset))
         coins_collected += 1
         if sound_on:
             try:
@@ -309,20 +482,32 @@ def update():
                 pass
             sounds.money.play()
     
-    # Fail-safe: if player falls below the screen, respawn appropriately
-    if player.top > HEIGHT + TILE_SIZE:
+    # Fail-safe: if player falls below the level, respawn appropriately
+    if player.top > WORLD_HEIGHT + TILE_SIZE:
         if invuln_timer > 0:
             warp_to_spawn_no_penalty()
         else:
             lose_life_and_respawn()
 
     # Win when all coins are collected
-    if len(coins) == 0:
+    if coins_collected >= total_coins:
         game_win = True
         timer_active = False
 
 def on_key_down(key):
     global game_state, game_over, game_paused
+    if recorder is not None:
+        recorder.key_down(key)
+    if key == keys.F3:
+        profiler.toggle_overlay()
+        return
+    if key == keys.F4:
+        profiler.dump_json(PROFILE_DUMP + ".json")
+        profiler.dump_csv(PROFILE_DUMP + ".csv")
+        if collisions.stats is not None:
+            with open(PROFILE_DUMP + "_collisions.txt", "w") as f:
+                f.write(collisions.stats.report() + "\n")
+        return
     if game_state == "menu":
         action = menu_mod.handle_menu_key(key)
         if action == "start":
@@ -354,8 +539,10 @@ def on_key_down(key):
 
 def on_mouse_down(pos):
     global game_state, music_on, sound_on, game_over
+    if recorder is not None:
+        recorder.mouse_down(pos)
     if game_state == "menu":
-        btns = menu_mod.get_buttons()
+        btns = menu_mod.get_buttons((WIDTH, HEIGHT))
         if btns["start"].collidepoint(pos):
             stop_game_music()
             game_state = "playing"
@@ -378,7 +565,7 @@ def on_mouse_down(pos):
         game_state = "menu"
 
 def reset_game():
-    global player, game_over, game_win, coins, coins_collected, timer, timer_active, lives, invuln_timer
+    global player, game_over, game_win, coins_collected, timer, timer_active, lives, invuln_timer
     player.bottomleft = SPAWN_BOTTOMLEFT
     player.alive = True
     player.velocity_y = 0
@@ -386,15 +573,19 @@ def reset_game():
     player.sprite = fox_idle
     game_over = False
     game_win = False
-    coins = build("platformer_coins.csv", TILE_SIZE)
+    coins.restore()
     coins_collected = 0
     timer = timer_seconds
     timer_active = False
     lives = MAX_LIVES
     invuln_timer = 0
+    stepper.reset()
+    dirty_renderer.invalidate()
     start_game_music()
 
 def on_key_up(key):
+    if recorder is not None:
+        recorder.key_up(key)
     if game_state == "menu" or game_over:
         return
     if key == keys.LEFT or key == keys.RIGHT:
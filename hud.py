@@ -0,0 +1,107 @@
+"""Cached text and HUD/menu layers.
+
+TextCache keeps rendered text surfaces keyed by (text, fontsize, color),
+dropping the least recently used past its capacity, and places them the
+way screen.draw.text() does, so the pixels come out the same. CachedLayer
+holds the list of blits making up a HUD or menu and rebuilds it only when
+the values it shows change; a frame then costs one Surface.blits() call.
+"""
+from collections import OrderedDict
+
+import pygame
+from pgzero import ptext
+
+
+class TextCache(object):
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self._surfs = OrderedDict()
+
+    def get(self, text, fontsize, color):
+        key = (text, fontsize, color)
+        surf = self._surfs.get(key)
+        if surf is None:
+            surf = self._surfs[key] = ptext.getsurf(text, fontsize=fontsize, color=color, cache=False)
+            if len(self._surfs) > self.capacity:
+                self._surfs.popitem(last=False)
+        else:
+            self._surfs.move_to_end(key)
+        return surf
+
+    def place(self, text, fontsize, color, topleft=None, center=None):
+        """(surface, position) for text at topleft or centred on center, as screen.draw.text() puts it."""
+        surf = self.get(text, fontsize, color)
+        if center is not None:
+            w, h = surf.get_size()
+            return surf, (int(round(center[0] - 0.5 * w)), int(round(center[1] - 0.5 * h)))
+        return surf, (int(round(topleft[0])), int(round(topleft[1])))
+
+    def __len__(self):
+        return len(self._surfs)
+
+
+# Shared by the HUD and the menus
+text_cache = TextCache()
+
+HEART_PATTERN = (
+    "01100110",
+    "11111111",
+    "11111111",
+    "11111111",
+    "01111110",
+    "00111100",
+    "00011000",
+)
+
+_hearts = {}
+
+
+def heart_sprite(size=20, color="red"):
+    """Pixel heart (8x7 cells, scaled to size) on a transparent surface, rendered once per size and color."""
+    key = (size, color)
+    surf = _hearts.get(key)
+    if surf is None:
+        scale = max(1, int(size / 8))
+        surf = pygame.Surface((8 * scale, 7 * scale), pygame.SRCALPHA)
+        fill = pygame.Color(color)
+        for row, line in enumerate(HEART_PATTERN):
+            for col, ch in enumerate(line):
+                if ch == "1":
+                    surf.fill(fill, (col * scale, row * scale, scale, scale))
+        _hearts[key] = surf
+    return surf
+
+
+_boxes = {}
+
+
+def filled_box(size, color):
+    """Solid size surface of color (a cached stand-in for draw.filled_rect)."""
+    key = (tuple(size), color)
+    surf = _boxes.get(key)
+    if surf is None:
+        surf = _boxes[key] = pygame.Surface(key[0])
+        surf.fill(pygame.Color(color))
+    return surf
+
+
+class CachedLayer(object):
+    """Blits of one screen layer, from build(*key) called only when the key passed to draw() changes."""
+
+    _UNSET = object()
+
+    def __init__(self, build):
+        self.build = build
+        self._key = self._UNSET
+        self._blits = []
+        self.rebuilds = 0
+
+    def draw(self, surf, key):
+        if key != self._key:
+            self._blits = list(self.build(*key))
+            self._key = key
+            self.rebuilds += 1
+        surf.blits(self._blits, doreturn=False)
+
+    def invalidate(self):
+        self._key = self._UNSET
@@ -0,0 +1,205 @@
+"""Compiled binary cache of the level's tile layers.
+
+Sources are either a TMX map path (every tile layer, read in one pass by
+tmx.load_tmx) or a {layer name: CSV path} dict of Tiled CSV exports.
+
+The cache holds one int32 grid per layer (-1 = empty, Tiled flip bits kept
+in the bit pattern) behind a small header, and is loaded through a memory
+map, so startup and restarts never decode layer text. load_level() rebuilds
+the cache whenever a source file (for a TMX, also the external tilesets it
+references) is newer than it, or its layer names no longer match.
+
+Each grid is stored as square chunks of `chunk` cells a side, chunk by
+chunk in row-major order (cells row-major inside a chunk, edge chunks padded
+with -1), so one chunk is one contiguous read and a streamed level only
+pages in the chunks it uses. The tile count of every layer is kept too, so
+totals never need a scan.
+
+The cache is a local build artifact in native byte order. Layout:
+    header  "FXLV", version, rows, cols, chunk, layer count   (6 x 4 bytes)
+    layer   name length, name padded to 4 bytes, tile count,
+            chunk_rows*chunk_cols chunks of chunk*chunk int32 cells
+"""
+import mmap
+import os
+import struct
+from array import array
+
+from platformer import read_csv_layer
+from tmx import load_tmx, map_outline
+
+MAGIC = b"FXLV"
+VERSION = 2
+CHUNK = 16  # cells per chunk side
+_HEADER = struct.Struct("=4sIIIII")
+_NAME_LEN = struct.Struct("=I")
+_COUNT = struct.Struct("=I")
+
+
+class Level(object):
+    """Layers of a compiled level as memoryviews of chunked int32 cells."""
+
+    def __init__(self, buf, owner=None):
+        self._owner = owner  # mmap (or bytes) the views point into
+        magic, version, rows, cols, chunk, count = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a level cache (or an old version)")
+        self.rows = rows
+        self.cols = cols
+        self.chunk = chunk
+        self.chunk_rows = -(-rows // chunk)
+        self.chunk_cols = -(-cols // chunk)
+        self.layers = {}
+        self.counts = {}
+        view = memoryview(buf)
+        offset = _HEADER.size
+        size = self.chunk_rows * self.chunk_cols * chunk * chunk * 4
+        for _ in range(count):
+            (name_len,) = _NAME_LEN.unpack_from(buf, offset)
+            offset += _NAME_LEN.size
+            name = bytes(view[offset:offset + name_len]).decode("utf-8")
+            offset += (name_len + 3) & ~3
+            (self.counts[name],) = _COUNT.unpack_from(buf, offset)
+            offset += _COUNT.size
+            self.layers[name] = view[offset:offset + size].cast("i")
+            offset += size
+
+    def chunk_cells(self, name, cx, cy):
+        """Cells of chunk (cx, cy) of a layer, chunk*chunk of them row-major (a memoryview)."""
+        n = self.chunk * self.chunk
+        start = (cy * self.chunk_cols + cx) * n
+        return self.layers[name][start:start + n]
+
+    def cell(self, name, col, row):
+        """Cell value at (col, row), or -1 outside the level."""
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return -1
+        chunk = self.chunk
+        cy, r = divmod(row, chunk)
+        cx, c = divmod(col, chunk)
+        return self.layers[name][(cy * self.chunk_cols + cx) * chunk * chunk + r * chunk + c]
+
+    def count(self, name):
+        """Number of tiles in a layer."""
+        return self.counts[name]
+
+    def layer(self, name):
+        """The whole layer as a flat row-major sequence of cells."""
+        chunk = self.chunk
+        cells = self.layers[name]
+        out = array("i")
+        for row in range(self.rows):
+            cy, r = divmod(row, chunk)
+            base = cy * self.chunk_cols * chunk * chunk + r * chunk
+            for cx in range(self.chunk_cols):
+                start = base + cx * chunk * chunk
+                out.extend(cells[start:start + min(chunk, self.cols - cx * chunk)])
+        return out
+
+    def close(self):
+        for cells in self.layers.values():
+            cells.release()
+        self.layers = {}
+        if isinstance(self._owner, mmap.mmap):
+            self._owner.close()
+        self._owner = None
+
+
+def _to_int32(value):
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+def _read_sources(sources):
+    if isinstance(sources, str):
+        tiled_map = load_tmx(sources)
+        return [(name, layer.height, layer.width, layer.cells) for name, layer in tiled_map.layers.items()]
+    layers = []
+    for name, path in sources.items():
+        rows, cols, cells = read_csv_layer(path)
+        layers.append((name, rows, cols, cells))
+    return layers
+
+
+def _dependencies(sources):
+    """(files the compiled level depends on, its layer names in order) for sources."""
+    if isinstance(sources, str):
+        # The map and the external tilesets (.tsx) load_tmx() reads with it
+        tilesets, names = map_outline(sources)
+        return [sources] + tilesets, names
+    return list(sources.values()), list(sources)
+
+
+def _chunked(cells, rows, cols, chunk):
+    """Row-major cells rearranged into padded chunks, as stored in the cache."""
+    out = array("i")
+    pad = array("i", [-1]) * chunk
+    for cy in range(0, rows, chunk):
+        for cx in range(0, cols, chunk):
+            for row in range(cy, cy + chunk):
+                if row < rows:
+                    part = cells[row * cols + cx:row * cols + min(cx + chunk, cols)]
+                    out.extend(part)
+                    out.extend(pad[:chunk - len(part)])
+                else:
+                    out.extend(pad)
+    return out
+
+
+def compile_level(sources, chunk=CHUNK):
+    """Compile a TMX path or {layer name: CSV path} into the binary cache format (bytes)."""
+    grids = []
+    shape = None
+    for name, rows, cols, cells in _read_sources(sources):
+        if shape is not None and shape != (rows, cols):
+            raise ValueError(f"layer {name!r} is {rows}x{cols}, expected {shape[0]}x{shape[1]}")
+        shape = (rows, cols)
+        grids.append((name, array("i", [_to_int32(v) for v in cells])))
+    rows, cols = shape if shape is not None else (0, 0)
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, rows, cols, chunk, len(grids)))
+    for name, cells in grids:
+        raw = name.encode("utf-8")
+        out += _NAME_LEN.pack(len(raw))
+        out += raw + b"\0" * (((len(raw) + 3) & ~3) - len(raw))
+        out += _COUNT.pack(len(cells) - cells.count(-1))
+        if cells.itemsize != 4:
+            raise ValueError("array('i') is not 32-bit on this platform")
+        out += _chunked(cells, rows, cols, chunk).tobytes()
+    return bytes(out)
+
+
+def _is_stale(paths, cache_path):
+    try:
+        built = os.path.getmtime(cache_path)
+    except OSError:
+        return True
+    return any(os.path.getmtime(path) > built for path in paths)
+
+
+def _open(cache_path):
+    with open(cache_path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Level(mm, mm)
+
+
+def load_level(sources, cache_path):
+    """Level for sources, compiling cache_path first if it is missing or stale."""
+    paths, names = _dependencies(sources)
+    if not _is_stale(paths, cache_path):
+        try:
+            level = _open(cache_path)
+            if list(level.layers) == names:
+                return level
+            level.close()
+        except (OSError, ValueError):
+            pass
+    data = compile_level(sources)
+    try:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+        return _open(cache_path)
+    except OSError:
+        # Read-only checkout: use the compiled bytes without caching them
+        return Level(data, data)
@@ -1,20 +1,33 @@
 from pygame import Rect
 from pgzero.builtins import keys
+from hud import text_cache, filled_box, CachedLayer
+from background import Backdrop
 _buttons = {}
+_layouts = {}
 
-def draw_menu(screen, WIDTH, music_on=True, sound_on=True):
-    screen.blit("menu", (0, 0))
+# Full-screen art, each built once per screen size into a single opaque blit
+_menu_bg = Backdrop("menu", tile=False, pos=(0, 0))
+_gameover_bg = Backdrop("gameover", tile=False, pos=(-100, -30))
+_win_bg = Backdrop("win", tile=False, pos=(-70, -70))
+
+def _layout(width, height):
+    """Button rects for a screen size, computed once per size."""
+    layout = _layouts.get((width, height))
+    if layout is None:
+        layout = _layouts[(width, height)] = _compute_layout(width, height)
+    return layout
 
+def _compute_layout(width, height):
     button_w = 200
     button_h = 60
     button_gap = 30
     bottom_margin = 40
     right_margin = 60
 
-    button_x = screen.width - button_w - right_margin
+    button_x = width - button_w - right_margin
     total_buttons = 4
     total_height = total_buttons * button_h + (total_buttons - 1) * button_gap
-    button_start_y = screen.height - bottom_margin - total_height
+    button_start_y = height - bottom_margin - total_height
     button_music_y = button_start_y + button_h + button_gap
     button_sound_y = button_music_y + button_h + button_gap
     button_exit_y = button_sound_y + button_h + button_gap
@@ -23,30 +36,40 @@ def draw_menu(screen, WIDTH, music_on=True, sound_on=True):
     music = Rect((button_x, button_music_y), (button_w, button_h))
     sound = Rect((button_x, button_sound_y), (button_w, button_h))
     exitb = Rect((button_x, button_exit_y), (button_w, button_h))
+    return {
+        "start": start,
+        "music": music,
+        "sound": sound,
+        "exit": exitb,
+    }
 
-    screen.draw.filled_rect(start, "orange")
-    screen.draw.text("START", center=start.center, fontsize=40, color="black")
-
-    screen.draw.filled_rect(music, "orange")
-    screen.draw.filled_rect(sound, "orange")
-    screen.draw.filled_rect(exitb, "orange")
-    screen.draw.text("QUIT", center=exitb.center, fontsize=40, color="black")
+def _menu_blits(width, height, music_on, sound_on):
+    buttons = _layout(width, height)
+    box = filled_box(buttons["start"].size, "orange")
+    blits = [(box, buttons[name].topleft) for name in ("start", "music", "sound", "exit")]
+    blits.append(text_cache.place("START", 40, "black", center=buttons["start"].center))
+    blits.append(text_cache.place("QUIT", 40, "black", center=buttons["exit"].center))
     # Dynamic labels for music/sound
     music_text = "Music: On" if music_on else "Music: Off"
     sound_text = "Sound: On" if sound_on else "Sound: Off"
-    screen.draw.text(music_text, center=music.center, fontsize=32, color="black")
-    screen.draw.text(sound_text, center=sound.center, fontsize=32, color="black")
+    blits.append(text_cache.place(music_text, 32, "black", center=buttons["music"].center))
+    blits.append(text_cache.place(sound_text, 32, "black", center=buttons["sound"].center))
+    return blits
 
+# Buttons and labels only change with the screen size or a toggle
+_menu_layer = CachedLayer(_menu_blits)
+
+def draw_menu(screen, WIDTH, music_on=True, sound_on=True):
     global _buttons
-    _buttons = {
-        "start": start,
-        "music": music,
-        "sound": sound,
-        "exit": exitb,
-    }
+    _menu_bg.draw(screen.surface)
+    _buttons = _layout(screen.width, screen.height)
+    _menu_layer.draw(screen.surface, (screen.width, screen.height, music_on, sound_on))
     return _buttons
 
-def get_buttons():
+def get_buttons(size=None):
+    """Buttons as last drawn; before the first draw (headless replays), the layout for size."""
+    if not _buttons and size is not None:
+        return _layout(*size)
     return _buttons
 
 def handle_menu_key(key):
@@ -57,19 +80,15 @@ def handle_menu_key(key):
     return None
 
 def draw_gameover_screen(screen, WIDTH, HEIGHT):
-    try:
-        screen.blit("gameover", (-100, -30))
-    except Exception:
-        screen.clear()
-        screen.fill("black")
-    screen.draw.text("Pressione ENTER ou ESPAÇO", center=(WIDTH/2, HEIGHT/2 + 20), fontsize=40, color="white")
-    screen.draw.text("para voltar ao menu", center=(WIDTH/2, HEIGHT/2 + 60), fontsize=30, color="white")
+    _gameover_bg.draw(screen.surface)  # black if the image is missing
+    _draw_back_to_menu(screen, WIDTH, HEIGHT)
 
 def draw_win_screen(screen, WIDTH, HEIGHT):
-    try:
-        screen.blit("win", (-70, -70))
-    except Exception:
-        screen.clear()
-        screen.fill("black")
-    screen.draw.text("Pressione ENTER ou ESPAÇO", center=(WIDTH/2, HEIGHT/2 + 20), fontsize=40, color="white")
-    screen.draw.text("para voltar ao menu", center=(WIDTH/2, HEIGHT/2 + 60), fontsize=30, color="white")
+    _win_bg.draw(screen.surface)
+    _draw_back_to_menu(screen, WIDTH, HEIGHT)
+
+def _draw_back_to_menu(screen, WIDTH, HEIGHT):
+    screen.surface.blits([
+        text_cache.place("Pressione ENTER ou ESPAÇO", 40, "white", center=(WIDTH/2, HEIGHT/2 + 20)),
+        text_cache.place("para voltar ao menu", 30, "white", center=(WIDTH/2, HEIGHT/2 + 60)),
+    ], doreturn=False)
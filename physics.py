@@ -0,0 +1,110 @@
+"""Swept AABB movement against a tile layer.
+
+move_box() moves a box one axis at a time. Each axis sweeps the box over
+the whole distance and stops it at the nearest tile in the way, so a fast
+fall cannot skip over a thin platform. Only tiles in the swept strip are
+looked at (a grid query on a TileLayer), so the cost doesn't grow with
+the level. Tiles block with their opaque bounds (collisions.alpha_bbox).
+With collision stats on, each tile looked at counts as a pair and each
+one in the way as a hit, under whatever collision_site is active.
+"""
+from collections import namedtuple
+
+import collisions
+from collisions import alpha_bbox
+from platformer import tiles_near
+
+Box = namedtuple("Box", "left top right bottom")
+
+# Distance below the box within which ground counts as touching it
+GROUND_SKIN = 1
+
+
+class Contacts(object):
+    """What move_box() ran into; each *_tile is the tile touched on that side, or None."""
+
+    __slots__ = ("ground", "ceiling", "wall_left", "wall_right")
+
+    def __init__(self):
+        self.ground = None
+        self.ceiling = None
+        self.wall_left = None
+        self.wall_right = None
+
+    @property
+    def grounded(self):
+        return self.ground is not None
+
+
+def solid_box(tile):
+    """World-space box of the tile's opaque pixels, or None if it has none."""
+    surf = getattr(tile, "_surf", None)
+    bbox = alpha_bbox(surf) if surf is not None else (0, 0, tile.width, tile.height)
+    if bbox is None:
+        return None
+    x0, y0, x1, y1 = bbox
+    return Box(tile.left + x0, tile.top + y0, tile.left + x1, tile.top + y1)
+
+
+def _blockers(tiles, strip):
+    stats = collisions.stats
+    if stats is not None:
+        stats.add("layer_queries")
+    for tile in tiles_near(tiles, strip):
+        box = solid_box(tile)
+        if stats is not None:
+            stats.add("pairs")
+            if box is None:
+                stats.add("bbox_rejects")
+        if box is not None and box.left < strip.right and box.right > strip.left \
+                and box.top < strip.bottom and box.bottom > strip.top:
+            if stats is not None:
+                stats.add("hits")
+            yield tile, box
+        elif box is not None and stats is not None:
+            stats.add("aabb_rejects")
+
+
+def move_box(tiles, box, dx, dy):
+    """Move box by dx, then dy, stopping at solid tiles.
+
+    Returns (left, top, contacts). Tiles the box already overlaps don't
+    block it, so a box that ends up inside a tile can always move out.
+    """
+    contacts = Contacts()
+    left, top, right, bottom = box
+
+    if dx > 0:
+        strip = Box(right, top, right + dx, bottom)
+        for tile, b in _blockers(tiles, strip):
+            if b.left >= right and b.left - right < dx:
+                dx = b.left - right
+                contacts.wall_right = tile
+    elif dx < 0:
+        strip = Box(left + dx, top, left, bottom)
+        for tile, b in _blockers(tiles, strip):
+            if b.right <= left and b.right - left > dx:
+                dx = b.right - left
+                contacts.wall_left = tile
+    left += dx
+    right += dx
+
+    if dy >= 0:
+        # Falling or standing: sweep down, plus a skin so resting on a tile reports ground
+        strip = Box(left, bottom, right, bottom + dy + GROUND_SKIN)
+        reach = dy + GROUND_SKIN
+        for tile, b in _blockers(tiles, strip):
+            if b.top >= bottom and b.top - bottom < reach:
+                reach = b.top - bottom
+                contacts.ground = tile
+        if contacts.ground is not None:
+            dy = reach  # land on it (snapping down the skin if need be)
+    else:
+        strip = Box(left, top + dy, right, top)
+        for tile, b in _blockers(tiles, strip):
+            if b.bottom <= top and b.bottom - top > dy:
+                dy = b.bottom - top
+                contacts.ceiling = tile
+    top += dy
+
+    return left, top, contacts
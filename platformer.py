@@ -1,41 +1,499 @@
+import math
+import pygame
 from pgzero import game, loaders
 from pgzero.actor import Actor, POS_TOPLEFT, ANCHOR_CENTER, transform_anchor
 
 
-def build(filename, tile_size):
+class TileGrid(object):
+    """Uniform grid index of tile actors keyed by (col, row).
+
+    One tile per cell, as in a Tiled layer. Queries return tiles in row-major
+    order, the same order build() lays them out in, so "first hit" scans keep
+    their result when switched to the grid.
+    """
+
+    def __init__(self, tile_size):
+        self.tile_size = tile_size
+        self.cells = {}
+        self._reach_x = 0  # extra cells a tile wider/taller than tile_size spills into
+        self._reach_y = 0
+
+    def cell_of(self, x, y):
+        return int(math.floor(x / self.tile_size)), int(math.floor(y / self.tile_size))
+
+    def insert(self, item):
+        key = self.cell_of(item.left, item.top)
+        self.cells[key] = item
+        w, h = item.width, item.height
+        self._reach_x = max(self._reach_x, int(math.ceil(w / self.tile_size)) - 1)
+        self._reach_y = max(self._reach_y, int(math.ceil(h / self.tile_size)) - 1)
+        return key
+
+    def discard(self, item):
+        key = self.cell_of(item.left, item.top)
+        if self.cells.get(key) is item:
+            del self.cells[key]
+
+    def tile_at(self, col, row):
+        return self.cells.get((col, row))
+
+    def query_rect(self, rect):
+        """Tiles whose cell overlaps rect (anything with left/top/right/bottom)."""
+        ts = self.tile_size
+        c0 = int(math.floor(rect.left / ts)) - self._reach_x
+        r0 = int(math.floor(rect.top / ts)) - self._reach_y
+        c1 = int(math.ceil(rect.right / ts))
+        r1 = int(math.ceil(rect.bottom / ts))
+        cells = self.cells
+        found = []
+        for row in range(r0, r1):
+            for col in range(c0, c1):
+                item = cells.get((col, row))
+                if item is not None:
+                    found.append(item)
+        return found
+
+    def at_point(self, point):
+        """First tile containing point, else None."""
+        col, row = self.cell_of(point[0], point[1])
+        cells = self.cells
+        for r in range(row - self._reach_y, row + 1):
+            for c in range(col - self._reach_x, col + 1):
+                item = cells.get((c, r))
+                if item is not None and item.collidepoint(point):
+                    return item
+        return None
+
+
+class TileLayer(list):
+    """List of tile actors returned by build(), with a TileGrid kept in sync.
+
+    version is bumped on every change (item and slice assignment and
+    deletion and += included) so caches derived from the layer (baked
+    collision masks, pre-rendered surfaces) know when to rebuild.
+    """
+
+    def __init__(self, items=(), tile_size=1):
+        super().__init__(items)
+        self.grid = TileGrid(tile_size)
+        self.version = 0
+        self._runs = None  # (version, runs, index), built on first use
+        for item in self:
+            self.grid.insert(item)
+
+    def append(self, item):
+        super().append(item)
+        self.grid.insert(item)
+        self.version += 1
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        for item in items:
+            self.grid.insert(item)
+        self.version += 1
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self.grid.insert(item)
+        self.version += 1
+
+    def remove(self, item):
+        super().remove(item)
+        self.grid.discard(item)
+        self.version += 1
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self.grid.discard(item)
+        self.version += 1
+        return item
+
+    def clear(self):
+        super().clear()
+        self.grid.cells.clear()
+        self.version += 1
+
+    def __setitem__(self, index, value):
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        if isinstance(index, slice):
+            value = list(value)
+        super().__setitem__(index, value)
+        for item in old:
+            self.grid.discard(item)
+        for item in value if isinstance(index, slice) else [value]:
+            self.grid.insert(item)
+        self.version += 1
+
+    def __delitem__(self, index):
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for item in old:
+            self.grid.discard(item)
+        self.version += 1
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def _run_index(self):
+        if self._runs is None or self._runs[0] != self.version:
+            runs = find_runs(self.grid)
+            index = {}
+            for run in runs:
+                for col in range(run.start_col, run.end_col + 1):
+                    index[(col, run.row)] = run
+            self._runs = (self.version, runs, index)
+        return self._runs
+
+    def runs(self):
+        """Horizontal runs of contiguous tiles, row by row (rebuilt after the layer changes)."""
+        return self._run_index()[1]
+
+    def run_at(self, col, row):
+        return self._run_index()[2].get((col, row))
+
+    def run_of(self, tile):
+        """Run the tile belongs to, or None if it isn't in this layer."""
+        return self.run_at(*self.grid.cell_of(tile.left, tile.top))
+
+    def tile_at(self, col, row):
+        return self.grid.tile_at(col, row)
+
+
+class TileSet(object):
+    """Grid-indexed set of tiles with O(1) membership and removal, for collectibles.
+
+    Iterates in insertion (row-major) order like a TileLayer and shares its
+    query API (grid, version). snapshot() remembers the current contents and
+    restore() brings them back without rebuilding any tile.
+    """
+
+    def __init__(self, items=(), tile_size=1):
+        self.grid = TileGrid(tile_size)
+        self.version = 0
+        self._snapshot = None
+        for item in items:
+            self.grid.insert(item)
+
+    def __iter__(self):
+        return iter(self.grid.cells.values())
+
+    def __len__(self):
+        return len(self.grid.cells)
+
+    def __contains__(self, item):
+        return self.grid.cells.get(self.grid.cell_of(item.left, item.top)) is item
+
+    def add(self, item):
+        self.grid.insert(item)
+        self.version += 1
+
+    def remove(self, item):
+        if item not in self:
+            raise ValueError("tile not in set")
+        self.grid.discard(item)
+        self.version += 1
+
+    def discard(self, item):
+        if item in self:
+            self.grid.discard(item)
+            self.version += 1
+
+    def snapshot(self):
+        self._snapshot = dict(self.grid.cells)
+
+    def restore(self):
+        """Back to the contents at the last snapshot()."""
+        cells = self.grid.cells
+        cells.clear()
+        cells.update(self._snapshot)
+        self.version += 1
+
+
+def tiles_near(items, rect):
+    """Items that may overlap rect: a grid lookup for a TileLayer, else all of them."""
+    grid = getattr(items, "grid", None)
+    if grid is None:
+        return items
+    return grid.query_rect(rect)
+
+
+def tile_at_point(items, point):
+    """First item containing point, using the grid when items is a TileLayer."""
+    grid = getattr(items, "grid", None)
+    if grid is not None:
+        return grid.at_point(point)
+    for it in items:
+        if it.collidepoint(point):
+            return it
+    return None
+
+
+class TileRun(object):
+    """Contiguous tiles start_col..end_col (inclusive) of one row, with their pixel extent."""
+
+    __slots__ = ("row", "start_col", "end_col", "first", "last", "left", "top", "right", "bottom")
+
+    def __init__(self, row, start_col, end_col, first, last):
+        self.row = row
+        self.start_col = start_col
+        self.end_col = end_col
+        self.first = first  # leftmost and rightmost tiles
+        self.last = last
+        self.left = first.left
+        self.top = first.top
+        self.right = last.right
+        self.bottom = last.bottom
+
+    def __repr__(self):
+        return f"TileRun(row={self.row}, start_col={self.start_col}, end_col={self.end_col})"
+
+    def contains(self, point):
+        x, y = point
+        return self.left <= x < self.right and self.top <= y < self.bottom
+
+
+def find_runs(grid):
+    """Maximal horizontal runs of occupied cells in a TileGrid, in row-major order."""
+    runs = []
+    cells = grid.cells
+    for col, row in sorted(cells, key=lambda c: (c[1], c[0])):
+        if (col - 1, row) in cells:
+            continue  # not the start of a run
+        end = col
+        while (end + 1, row) in cells:
+            end += 1
+        runs.append(TileRun(row, col, end, cells[(col, row)], cells[(end, row)]))
+    return runs
+
+
+def as_layer(items, tile_size):
+    """items as a grid-indexed layer: layers are returned as they are, plain lists wrapped in a TileLayer.
+
+    Wrap once and share the result; every TileLayer builds its own grid and run index.
+    """
+    if hasattr(items, "run_of"):
+        return items
+    return TileLayer(items, tile_size)
+
+
+def run_of(layer, tile):
+    """TileRun containing tile, from the layer's own lookup (TileLayer, ChunkedLayer).
+
+    Raises TypeError for plain lists (see as_layer) and ValueError if the tile isn't in the layer.
+    """
+    if not hasattr(layer, "run_of"):
+        raise TypeError("run_of() needs a TileLayer or ChunkedLayer; wrap plain lists once with as_layer()")
+    run = layer.run_of(tile)
+    if run is None:
+        raise ValueError(f"tile at ({tile.left}, {tile.top}) is not part of the platform layer")
+    return run
+
+
+# Tiled stores flip/rotate flags in the top bits of each cell value
+FLIPPED_H = 0x80000000
+FLIPPED_V = 0x40000000
+FLIPPED_D = 0x20000000
+ROTATED_HEX = 0x10000000
+GID_MASK = 0x0FFFFFFF
+FLIP_BITS = FLIPPED_H | FLIPPED_V | FLIPPED_D
+
+_tile_protos = {}
+
+
+def display_format(surf):
+    """Standalone copy of surf in the display's pixel format, keeping per-pixel alpha only if it has
+    see-through pixels (fully opaque images blit faster without). Returned as is while there is no display.
+    """
+    if pygame.display.get_surface() is None:
+        return surf
+    w, h = surf.get_size()
+    if surf.get_flags() & pygame.SRCALPHA and pygame.mask.from_surface(surf, 254).count() < w * h:
+        return surf.convert_alpha()
+    return surf.convert()
+
+
+def orient_tile(surf, flags):
+    """Apply Tiled's flip flags to surf: diagonal flip first, then horizontal, then vertical.
+
+    ROTATED_HEX only means something on hexagonal maps and is ignored here.
+    """
+    if flags & FLIPPED_D:
+        # Diagonal flip == transpose
+        surf = pygame.transform.flip(pygame.transform.rotate(surf, 90), False, True)
+    if flags & (FLIPPED_H | FLIPPED_V):
+        surf = pygame.transform.flip(surf, bool(flags & FLIPPED_H), bool(flags & FLIPPED_V))
+    return surf
+
+
+class TileProto(object):
+    """Data shared by every tile with the same id and orientation: image key, surface and size.
+
+    Collision masks are cached per surface (see collisions.surface_mask), so
+    all tiles of one prototype share those too.
+    """
+
+    __slots__ = ("tile_id", "flips", "image", "surf", "width", "height")
+
+    def __init__(self, tile_id, flips=0):
+        self.tile_id = tile_id
+        self.flips = flips
+        self.image = f"tiles/tile_{tile_id:04d}"
+        self.surf = display_format(orient_tile(loaders.images.load(self.image), flips))
+        self.width, self.height = self.surf.get_size()
+
+
+def tile_proto(tile_id, flips=0):
+    key = (tile_id, flips & FLIP_BITS)
+    proto = _tile_protos.get(key)
+    if proto is None:
+        proto = _tile_protos[key] = TileProto(tile_id, key[1])
+    return proto
+
+
+class Tile(object):
+    """Compact tile record: prototype, (col, row), flip bits and pixel position.
+
+    Provides the parts of the Actor API the game uses on tiles (rect
+    attributes, colliderect, collidepoint, draw, _surf). Use actor() when a
+    full Actor is needed.
+    """
+
+    __slots__ = ("proto", "col", "row", "flags", "left", "top")
+
+    def __init__(self, proto, col, row, flags, tile_size):
+        self.proto = proto
+        self.col = col
+        self.row = row
+        self.flags = flags
+        self.left = tile_size * col
+        self.top = tile_size * row
+
+    @property
+    def _surf(self):
+        return self.proto.surf
+
+    @property
+    def image(self):
+        return self.proto.image
+
+    @property
+    def width(self):
+        return self.proto.width
+
+    @property
+    def height(self):
+        return self.proto.height
+
+    @property
+    def right(self):
+        return self.left + self.proto.width
+
+    @property
+    def bottom(self):
+        return self.top + self.proto.height
+
+    @property
+    def x(self):
+        return self.left + self.proto.width * 0.5
+
+    @property
+    def y(self):
+        return self.top + self.proto.height * 0.5
+
+    @property
+    def pos(self):
+        return self.x, self.y
+
+    @property
+    def topleft(self):
+        return self.left, self.top
+
+    @property
+    def size(self):
+        return self.proto.width, self.proto.height
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.left, self.top, self.proto.width, self.proto.height)
+
+    @property
+    def flip_x(self):
+        return bool(self.flags & FLIPPED_H)
+
+    @property
+    def flip_y(self):
+        return bool(self.flags & FLIPPED_V)
+
+    @property
+    def flip_d(self):
+        return bool(self.flags & FLIPPED_D)
+
+    def colliderect(self, other):
+        return (self.left < other.right and other.left < self.right and
+                self.top < other.bottom and other.top < self.bottom)
+
+    def collidepoint(self, point):
+        x, y = point
+        return self.left <= x < self.right and self.top <= y < self.bottom
+
+    def blit_item(self, offset=(0, 0)):
+        """(surface, position) to draw the tile with, shifted by offset."""
+        return self.proto.surf, (self.left + offset[0], self.top + offset[1])
+
+    def draw(self, offset=(0, 0)):
+        game.screen.blit(*self.blit_item(offset))
+
+    def actor(self):
+        """Materialize a full Actor for this tile (a new one on every call)."""
+        item = Actor(self.proto.image)
+        if self.flip_d:
+            item.flip_d = True
+        if self.flip_x:
+            item.flip_x = True
+        if self.flip_y:
+            item.flip_y = True
+        item._orig_surf = item._surf = self.proto.surf
+        item._update_pos()
+        item.topleft = (self.left, self.top)
+        return item
+
+
+def read_csv_layer(filename):
+    """Parse a Tiled CSV layer export into (rows, cols, cells), cells row-major (-1 = empty)."""
     with open(filename, "r") as f:
         contents = f.read().splitlines()
 
-    contents = [c.split(",") for c in contents]
-    for row in range(len(contents)):
-        for col in range(len(contents[0])):
-            val = contents[row][col]
-            if val.isdigit() or (val[0] == "-" and val[1:].isdigit()):
-                contents[row][col] = int(val)
+    contents = [c.split(",") for c in contents if c]
+    rows, cols = len(contents), len(contents[0])
+    cells = [int(val) for line in contents for val in line[:cols]]
+    return rows, cols, cells
+
+
+def build_layer(cells, cols, tile_size):
+    """TileLayer from a flat row-major sequence of cell values (-1 = empty).
 
+    Values may carry Tiled's flip bits either unsigned (CSV) or as the signed
+    int32 bit pattern (binary level cache).
+    """
     items = []
-    for row in range(len(contents)):
-        for col in range(len(contents[0])):
-            tile_num = contents[row][col]
-            if tile_num != -1:
-                flipped_h = bool(tile_num & 0x80000000)
-                flipped_v = bool(tile_num & 0x40000000)
-                flipped_d = bool(tile_num & 0x20000000)
-                rotated_hex = bool(tile_num & 0x10000000)
-                tile_num &= 0x0FFFFFFF
-                item = Actor(f"tiles/tile_{tile_num:04d}")
-                if flipped_d:
-                    item.flip_d = True
-                if flipped_h:
-                    item.flip_x = True
-                if flipped_v:
-                    item.flip_y = True
-                if rotated_hex:
-                    pass
-                item.topleft = (tile_size * col, tile_size * row)
-                items.append(item)
-
-    return items
+    for i, tile_num in enumerate(cells):
+        if tile_num != -1:
+            row, col = divmod(i, cols)
+            items.append(tile_from_cell(tile_num, col, row, tile_size))
+    return TileLayer(items, tile_size)
+
+
+def tile_from_cell(value, col, row, tile_size):
+    """Tile for one non-empty cell value (flip bits unsigned or as the int32 pattern)."""
+    value &= 0xFFFFFFFF
+    return Tile(tile_proto(value & GID_MASK, value), col, row, value & ~GID_MASK, tile_size)
+
+
+def build(filename, tile_size):
+    rows, cols, cells = read_csv_layer(filename)
+    return build_layer(cells, cols, tile_size)
 
 
 class SpriteSheet(object):
@@ -50,7 +508,7 @@ class SpriteSheet(object):
 
     def image_at(self, rectangle, color_key=None):
         x, y, w, h = rectangle
-        return self.sheet.subsurface((x, y, w, h))
+        return display_format(self.sheet.subsurface((x, y, w, h)))
 
     def images_at(self, rects, color_key=None):
         return [self.image_at(rect, color_key) for rect in rects]
@@ -60,7 +518,26 @@ class SpriteSheet(object):
         return self.images_at(tups, color_key)
 
 
+class AnimationClock(object):
+    """Global animation tick. Advanced once per game update; every SpriteActor reads it."""
+
+    def __init__(self):
+        self.tick = 0
+
+    def advance(self, steps=1):
+        self.tick += steps
+
+
+animation_clock = AnimationClock()
+
+
 class Sprite(object):
+    """Immutable frame strip shared by every actor that uses it.
+
+    Animation state lives on the actor (see SpriteActor), so any number of
+    actors can share one Sprite without speeding each other up.
+    """
+
     def __init__(self, filename, rect, count, color_key=None, frames=1, left_rect=None):
         self.filename = filename
         ss = SpriteSheet(f"./images/sprites/{filename}")
@@ -72,48 +549,25 @@ class Sprite(object):
                 self.images_left = ss.load_strip(left_rect, count, color_key)
             except Exception:
                 self.images_left = None
-        if self.images_left is None and isinstance(self.images, list) and len(self.images) > 0:
-            try:
-                self.images_left = [self._flip_h(img) for img in self.images]
-            except Exception:
-                self.images_left = None
-        self.i = 0
+        if self.images_left is None:
+            # Mirrored frames are made once here so drawing never flips per frame
+            self.images_left = [self._flip_h(img) for img in self.images]
+        # Frame table indexed by [facing][frame]; facing 1 is left
+        self.frame_table = (self.images, self.images_left)
         self.frames = frames
-        self.frame_num = frames
+        self.period = frames + 1  # ticks each frame stays on screen
 
-    def next(self, use_left=False):
-        current_images = self.images_left if (use_left and self.images_left) else self.images
-        if self.frame_num == 0:
-            self.i = (self.i + 1) % len(current_images)
-            self.frame_num = self.frames
-        else:
-            self.frame_num -= 1
-        return current_images[self.i]
+    def frame(self, index, left=False):
+        images = self.frame_table[1 if left else 0]
+        return images[index % len(images)]
+
+    def frame_at(self, elapsed, left=False):
+        """Frame shown after elapsed animation ticks."""
+        images = self.frame_table[1 if left else 0]
+        return images[(elapsed // self.period) % len(images)]
 
     def _flip_h(self, surf):
-        w, h = surf.get_size()
-        dst = surf.copy()
-        try:
-            dst.fill((0, 0, 0, 0))
-        except Exception:
-            try:
-                dst.fill((0, 0, 0))
-                if hasattr(dst, 'set_colorkey'):
-                    dst.set_colorkey((0, 0, 0))
-            except Exception:
-                pass
-        for x in range(w):
-            try:
-                column = surf.subsurface((x, 0, 1, h))
-                dst.blit(column, (w - 1 - x, 0))
-            except Exception:
-                step = 2
-                for xx in range(0, w, step):
-                    bw = min(step, w - xx)
-                    block = surf.subsurface((xx, 0, bw, h))
-                    dst.blit(block, (w - xx - bw, 0))
-                break
-        return dst
+        return pygame.transform.flip(surf, True, False)
 
 
 class Actor(Actor):
@@ -215,8 +669,18 @@ class Actor(Actor):
         self.pos = p
         self._mask = None
 
-    def draw(self):
-        game.screen.blit(self._surf, self.topleft)
+    def overlaps(self, rect):
+        """True if the actor overlaps rect (a pygame Rect), checked in C for culling."""
+        r = self._rect
+        return rect.colliderect(r.x, r.y, r.w, r.h)
+
+    def blit_item(self, offset=(0, 0)):
+        """(surface, position) to draw the actor with, shifted by offset."""
+        rect = self._rect  # straight to the rect: Actor.__getattr__ costs more than the blit
+        return self._surf, (rect.left + offset[0], rect.top + offset[1])
+
+    def draw(self, offset=(0, 0)):
+        game.screen.blit(*self.blit_item(offset))
 
 
 class SpriteActor(Actor):
@@ -227,11 +691,14 @@ class SpriteActor(Actor):
         self._mask = None
         self.fps = 5
         self.direction = 0
+        # Per-actor animation cursor: frame = f(global tick - start), frozen while paused
+        self._anim_start = animation_clock.tick
+        self._anim_frozen = None
         self.sprite = sprite
         # Pass image resource key without extension to PgZero loader
         base_name = sprite.filename[:-4] if sprite.filename.lower().endswith('.png') else sprite.filename
         super().__init__(f"sprites/{base_name}", pos, anchor, **kwargs)
-        self._orig_surf = self.sprite.images[self.sprite.i]
+        self._orig_surf = self.sprite.images[0]
         self._update_pos()
         self._transform_surf()
 
@@ -257,7 +724,25 @@ class SpriteActor(Actor):
         else:
             self.image = self._images[current + 1]
 
-    # Animation handled per-frame in draw via sprite.frame_num
+    @property
+    def paused(self):
+        return self._anim_frozen is not None
+
+    @paused.setter
+    def paused(self, paused):
+        if paused and self._anim_frozen is None:
+            self._anim_frozen = animation_clock.tick - self._anim_start
+        elif not paused and self._anim_frozen is not None:
+            self._anim_start = animation_clock.tick - self._anim_frozen
+            self._anim_frozen = None
+
+    def anim_elapsed(self):
+        if self._anim_frozen is not None:
+            return self._anim_frozen
+        return animation_clock.tick - self._anim_start
+
+    def current_frame(self):
+        return self._sprite.frame_at(self.anim_elapsed(), self._flip_x)
 
     @property
     def scale(self):
@@ -274,8 +759,8 @@ class SpriteActor(Actor):
 
     @flip_x.setter
     def flip_x(self, flip_x):
+        # Facing only selects the other half of the frame table; nothing to re-transform
         self._flip_x = flip_x
-        self._transform_surf()
 
     @property
     def flip_y(self):
@@ -292,6 +777,12 @@ class SpriteActor(Actor):
 
     @sprite.setter
     def sprite(self, sprite):
+        if sprite is not getattr(self, '_sprite', None):
+            # Switching strips restarts the animation
+            if self._anim_frozen is None:
+                self._anim_start = animation_clock.tick
+            else:
+                self._anim_frozen = 0
         self._sprite = sprite
 
     @property
@@ -316,31 +807,15 @@ class SpriteActor(Actor):
         self.pos = p
         self._mask = None
 
-    def draw(self):
+    def blit_item(self, offset=(0, 0)):
+        """(surface, position) of the current animation frame, shifted by offset."""
         if self.sprite:
-            # Choose frames based on flip_x; if no images_left, mirror at draw time
-            using_left_list = self.flip_x and bool(self.sprite.images_left)
-            base_images = self.sprite.images_left if using_left_list else self.sprite.images
-            # If paused, do NOT advance animation counters
-            if getattr(self, 'paused', False):
-                idx = self.sprite.i % len(base_images)
-                frame = base_images[idx]
-            else:
-                if self.sprite.frame_num == 0:
-                    self.sprite.i = (self.sprite.i + 1) % len(base_images)
-                    self.sprite.frame_num = self.sprite.frames
-                else:
-                    self.sprite.frame_num -= 1
-                frame = base_images[self.sprite.i]
-            if self.flip_x and not using_left_list:
-                # Dynamically mirror the frame if no left-facing strip exists
-                try:
-                    frame = self.sprite._flip_h(frame)
-                except Exception:
-                    pass
-            self._orig_surf = self._surf = frame
-            self._update_pos()
-            self._transform_surf()
-            game.screen.blit(self._surf, self.topleft)
-        else:
-            game.screen.blit(self._surf, self.topleft)
\ No newline at end of file
+            frame = self.current_frame()
+            if frame is not self._surf:
+                resized = frame.get_size() != self._surf.get_size()
+                self._orig_surf = self._surf = frame
+                if resized:
+                    self._update_pos()
+                    self._transform_surf()
+        rect = self._rect
+        return self._surf, (rect.left + offset[0], rect.top + offset[1])
@@ -1,5 +1,6 @@
 from platformer import SpriteActor
-from collisions import platform_collide
+from collisions import alpha_bbox, collision_site
+from physics import Box, Contacts, move_box
 
 
 ## Using shared collisions.pixel_perfect_collide
@@ -24,33 +25,36 @@ class Player(SpriteActor):
         self._world_w = width
         self._world_h = height
         self.grounded = False
+        self.contacts = Contacts()
+        self._hitbox = self._compute_hitbox()
 
-    def _find_solid_platform(self):
-        for plat in self._platforms:
-            if self.colliderect(plat) and platform_collide(self, plat):
-                return plat
-        return None
+    def _compute_hitbox(self):
+        """Union of the opaque bounds of every fox frame, relative to the actor's top-left."""
+        boxes = [alpha_bbox(f) for s in (self.idle_sprite, self.walk_sprite) for f in s.images + s.images_left]
+        boxes = [b for b in boxes if b is not None]
+        if not boxes:
+            return (0, 0, self.width, self.height)
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def hitbox(self):
+        x0, y0, x1, y1 = self._hitbox
+        return Box(self.left + x0, self.top + y0, self.left + x1, self.top + y1)
 
     def handle_input(self, keyboard):
-        moved = False
+        """Facing and sprite from the arrow keys; returns this tick's horizontal move."""
+        dx = 0
         if getattr(keyboard, 'left') and self.midleft[0] > 0:
-            self.x -= self.velocity_x
+            dx = -self.velocity_x
             self.sprite = self.walk_sprite
             self.flip_x = True
-            moved = True
-            obj = self._find_solid_platform()
-            if obj is not None:
-                self.x = obj.x + (obj.width/2 + self.width/2)
         elif getattr(keyboard, 'right') and self.midright[0] < self._world_w:
-            self.x += self.velocity_x
+            dx = self.velocity_x
             self.sprite = self.walk_sprite
             self.flip_x = False
-            moved = True
-            obj = self._find_solid_platform()
-            if obj is not None:
-                self.x = obj.x - (obj.width/2 + self.width/2)
-        if not moved:
+        else:
             self.sprite = self.idle_sprite
+        return dx
 
     def jump(self):
         if not self.jumping:
@@ -58,41 +62,24 @@ class Player(SpriteActor):
             self.jumping = True
             self.grounded = False
 
-    def apply_gravity(self):
-        # If currently grounded, keep attached to ground with a small downward probe
-        if self.grounded:
-            snap_done = False
-            for probe in (1, 2):
-                self.y += probe
-                obj = self._find_solid_platform()
-                if obj is not None:
-                    self.y = obj.y - (obj.height/2 + self.height/2)
-                    self.velocity_y = 0
-                    self.jumping = False
-                    snap_done = True
-                    break
-                self.y -= probe
-            if snap_done:
-                return
-            # no ground below within tolerance -> start falling
-            self.grounded = False
-
-        # Apply gravity when not grounded
-        self.y += self.velocity_y
+    def apply_gravity(self, dx=0):
+        # Move by this tick's velocity, then accelerate (jump arcs are unchanged)
+        dy = self.velocity_y
         self.velocity_y += self._gravity
-        obj = self._find_solid_platform()
-        if obj is not None:
-            if self.velocity_y > 0:
-                # Land on top
-                self.y = obj.y - (obj.height/2 + self.height/2)
-                self.jumping = False
-                self.grounded = True
-                # Ensure stable resting
-                self.velocity_y = 0
-                return
-            else:
+        x0, y0, _, _ = self._hitbox
+        with collision_site("platforms"):
+            left, top, self.contacts = move_box(self._platforms, self.hitbox(), dx, dy)
+        self.left = left - x0
+        self.top = top - y0
+        if self.contacts.ground is not None and dy >= 0:
+            # Landed or still standing
+            self.velocity_y = 0
+            self.jumping = False
+            self.grounded = True
+        else:
+            self.grounded = False
+            if self.contacts.ceiling is not None:
                 # Hit head under a platform
-                self.y = obj.y + (obj.height/2 + self.height/2)
                 self.velocity_y = 0
 
     def hit_obstacle(self):
@@ -101,5 +88,4 @@ class Player(SpriteActor):
     def update(self, keyboard):
         if not self.alive:
             return
-        self.handle_input(keyboard)
-        self.apply_gravity()
+        self.apply_gravity(self.handle_input(keyboard))
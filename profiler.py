@@ -0,0 +1,133 @@
+"""Per-frame phase profiler.
+
+Wrap each phase of update()/draw() in `with profiler.phase("name"):`. While
+the profiler is disabled phase() hands back a shared no-op context, so the
+instrumentation costs one attribute check per phase. When enabled, the time
+spent in each phase is summed per frame and the last `capacity` frames are
+kept in a ring buffer, which the overlay draws and dump_json/dump_csv export.
+"""
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+from pygame import Rect
+
+FRAME_BUDGET_MS = 1000.0 / 60
+
+
+class _NullPhase(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase(object):
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = perf_counter() - self.start
+        self.totals[self.name] = self.totals.get(self.name, 0.0) + elapsed
+        return False
+
+
+class PhaseProfiler(object):
+    def __init__(self, capacity=240, record=False):
+        self.record = record        # keep recording while the overlay is hidden
+        self.enabled = record
+        self.overlay = False
+        self.frames = deque(maxlen=capacity)  # (frame seconds, {phase: seconds})
+        self.phase_names = []                 # first-seen order, for stable columns
+        self._current = {}
+        self._frame_start = None
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        if name not in self.phase_names:
+            self.phase_names.append(name)
+        return _Phase(self._current, name)
+
+    def begin_frame(self):
+        """Close the previous frame (start to start, so it includes the flip and frame wait)."""
+        if not self.enabled:
+            self._frame_start = None
+            return
+        now = perf_counter()
+        if self._frame_start is not None:
+            self.frames.append((now - self._frame_start, self._current))
+        self._frame_start = now
+        self._current = {}
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.record
+
+    def averages(self, last=60):
+        """(mean frame ms, {phase: mean ms}) over the last `last` frames."""
+        frames = list(self.frames)[-last:]
+        if not frames:
+            return 0.0, {}
+        n = len(frames)
+        phases = {}
+        for name in self.phase_names:
+            phases[name] = sum(p.get(name, 0.0) for _, p in frames) * 1000.0 / n
+        return sum(f for f, _ in frames) * 1000.0 / n, phases
+
+    def draw_overlay(self, screen, topleft, graph_frames=120):
+        x, y = topleft
+        frame_ms, phases = self.averages()
+        width = graph_frames * 2
+        height = 40 + 16 * len(phases) + 50
+        screen.draw.filled_rect(Rect(x, y, width + 10, height), (0, 0, 0))
+        fps = 1000.0 / frame_ms if frame_ms else 0.0
+        screen.draw.text(f"frame {frame_ms:5.2f} ms  {fps:4.0f} fps", (x + 5, y + 5), fontsize=20, color="white")
+        ty = y + 25
+        for name, ms in phases.items():
+            screen.draw.text(f"{name:12} {ms:6.3f} ms", (x + 5, ty), fontsize=18, color="white")
+            ty += 16
+        # Frame-time graph: 2px per frame, budget line at 60 fps
+        base = y + height - 5
+        scale = 40.0 / (2 * FRAME_BUDGET_MS)
+        recent = list(self.frames)[-graph_frames:]
+        for i, (frame_s, _) in enumerate(recent):
+            ms = frame_s * 1000.0
+            h = max(1, min(40, int(ms * scale)))
+            color = (220, 60, 60) if ms > FRAME_BUDGET_MS * 1.05 else (80, 200, 80)
+            screen.draw.filled_rect(Rect(x + 5 + i * 2, base - h, 2, h), color)
+        budget_y = base - int(FRAME_BUDGET_MS * scale)
+        screen.draw.line((x + 5, budget_y), (x + 5 + width, budget_y), (255, 255, 0))
+
+    def rows(self):
+        """One dict per recorded frame: frame_ms plus each phase's ms."""
+        out = []
+        for frame_s, phases in self.frames:
+            row = {"frame_ms": frame_s * 1000.0}
+            for name in self.phase_names:
+                row[name] = phases.get(name, 0.0) * 1000.0
+            out.append(row)
+        return out
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"phases": self.phase_names, "frames": self.rows()}, f, indent=1)
+
+    def dump_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["frame_ms"] + self.phase_names)
+            writer.writeheader()
+            for row in self.rows():
+                writer.writerow({k: f"{v:.4f}" for k, v in row.items()})
@@ -0,0 +1,218 @@
+import math
+
+import pygame
+
+from background import Backdrop
+from platformer import tiles_near
+
+
+def _new_surface(size, alpha=False):
+    surf = pygame.Surface(size, pygame.SRCALPHA if alpha else 0)
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha() if alpha else surf.convert()
+    return surf
+
+
+class StaticLayerCache(object):
+    """Backdrops and static tile layers pre-rendered, seen through an optional camera.
+
+    The world is rendered in chunk_size squares the first time they come
+    into view (each from a grid query on the layers), and the chunks under
+    the camera are composed into one window-sized surface, allocated once
+    and redrawn in place. It is recomposed only when a layer changes (its
+    version, or its length for plain lists) or the camera moves, and
+    version counts those recompositions. A still frame costs a single blit
+    and the work follows the window size, not the world size.
+
+    Backdrops that scroll with the world (parallax 1) are baked into the
+    chunks; with any other parallax the chunks hold only the tiles and the
+    backdrops are drawn behind them when the view is composed.
+    """
+
+    def __init__(self, size, layers, backdrops=None, camera=None, chunk_size=512):
+        self.size = size
+        self.layers = list(layers)
+        if backdrops is None:
+            backdrops = (Backdrop("sky", fallback_color="skyblue"),)
+        self.backdrops = list(backdrops)
+        self._baked = all(b.parallax == 1 for b in self.backdrops)
+        self.camera = camera
+        self.chunk_size = chunk_size
+        self._chunks = {}
+        self._surf = None
+        self._key = None
+        self.version = 0  # bumped each time the view surface is redrawn
+
+    def _layers_key(self):
+        return tuple((id(layer), getattr(layer, "version", None), len(layer)) for layer in self.layers)
+
+    def _origin(self):
+        return (self.camera.x, self.camera.y) if self.camera is not None else (0, 0)
+
+    def invalidate(self):
+        self._key = None
+        self._chunks = {}
+
+    def surface(self):
+        layers_key = self._layers_key()
+        key = (layers_key, self._origin())
+        if key != self._key:
+            if self._key is None or layers_key != self._key[0]:
+                self._chunks = {}
+            self._render()
+            self._key = key
+            self.version += 1
+        return self._surf
+
+    def _chunk(self, cx, cy):
+        chunk = self._chunks.get((cx, cy))
+        if chunk is None:
+            cs = self.chunk_size
+            area = pygame.Rect(cx * cs, cy * cs, cs, cs)
+            chunk = _new_surface((cs, cs), alpha=not self._baked)
+            if self._baked:
+                for backdrop in self.backdrops:
+                    backdrop.draw(chunk, area.topleft)
+            for layer in self.layers:
+                for tile in tiles_near(layer, area):
+                    chunk.blit(tile._surf, (tile.left - area.left, tile.top - area.top))
+            self._chunks[(cx, cy)] = chunk
+        return chunk
+
+    def _render(self):
+        cs = self.chunk_size
+        ox, oy = self._origin()
+        w, h = self.size
+        if self._surf is None:
+            self._surf = _new_surface(self.size)
+        surf = self._surf
+        # Every pixel is painted over below: by the backdrops, or by chunks that have them baked in
+        if not self._baked:
+            for backdrop in self.backdrops:
+                backdrop.draw(surf, (ox, oy))
+        cx0, cy0 = ox // cs, oy // cs
+        cx1, cy1 = (ox + w - 1) // cs, (oy + h - 1) // cs
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                surf.blit(self._chunk(cx, cy), (cx * cs - ox, cy * cs - oy))
+        # Forget chunks that have scrolled more than a chunk out of view
+        for key in [k for k in self._chunks
+                    if not (cx0 - 1 <= k[0] <= cx1 + 1 and cy0 - 1 <= k[1] <= cy1 + 1)]:
+            del self._chunks[key]
+
+    def draw(self, screen):
+        screen.blit(self.surface(), (0, 0))
+
+
+def _actor_rect(actor, offset=(0, 0)):
+    # Blits land on truncated float positions; pad a pixel so nothing is left behind
+    left, top = int(math.floor(actor.left + offset[0])), int(math.floor(actor.top + offset[1]))
+    w, h = actor._surf.get_size()
+    return pygame.Rect(left - 1, top - 1, w + 2, h + 2)
+
+
+class RenderQueue(object):
+    """(surface, position) pairs collected per layer and drawn with one Surface.blits() per layer.
+
+    Layers are flushed in the order given to the constructor (then in the
+    order any other layer was first used), and items within a layer in the
+    order they were added, so the result matches blitting them one by one.
+    """
+
+    def __init__(self, layers=()):
+        self._layers = {name: [] for name in layers}
+        self.blits = 0  # items drawn, for profiling
+
+    def add(self, layer, item):
+        items = self._layers.get(layer)
+        if items is None:
+            items = self._layers[layer] = []
+        items.append(item)
+
+    def extend(self, layer, items):
+        for item in items:
+            self.add(layer, item)
+
+    def flush(self, surf):
+        for items in self._layers.values():
+            if items:
+                surf.blits(items, doreturn=False)
+                self.blits += len(items)
+                items.clear()
+
+    def clear(self):
+        for items in self._layers.values():
+            items.clear()
+
+
+class DirtyRectRenderer(object):
+    """Opt-in renderer that repaints only the regions that changed since the last frame.
+
+    Moving sprites are tracked by their previous and current rects; other
+    regions (collected coins, HUD) are added with mark_dirty() or through
+    the hud_key passed to begin(). Everything else is left on the screen
+    surface as it was, so the caller must not clear it between frames.
+
+    Per frame: begin() restores the background under every dirty rect and
+    returns the rects (or None when a full redraw is needed), the caller
+    repaints the static actors clipped to those rects and draws the moving
+    sprites and HUD on top, then end() records where the sprites ended up.
+    """
+
+    def __init__(self, background, hud_rect=None):
+        self.background = background
+        self.hud_rect = pygame.Rect(hud_rect) if hud_rect is not None else None
+        self.dirty_rects = []
+        self._prev_rects = {}
+        self._pending = []
+        self._hud_key = None
+        self._bg_version = None
+        self._full = True
+
+    def invalidate(self):
+        """Force the next frame to be redrawn in full (state change, reset, overlay screens)."""
+        self._full = True
+
+    def mark_dirty(self, rect):
+        self._pending.append(pygame.Rect(rect))
+
+    def begin(self, surf, moving, hud_key=None, offset=(0, 0)):
+        bg = self.background.surface()
+        hud_changed = hud_key != self._hud_key
+        self._hud_key = hud_key
+        if self._full or self.background.version != self._bg_version:
+            self._bg_version = self.background.version
+            self._full = False
+            self._pending = []
+            surf.blit(bg, (0, 0))
+            self.dirty_rects = [surf.get_rect()]
+            return None
+
+        rects = self._pending
+        self._pending = []
+        prev_rects = self._prev_rects
+        for actor in moving:
+            cur = _actor_rect(actor, offset)
+            prev = prev_rects.pop(id(actor), None)
+            rects.append(cur.union(prev) if prev is not None else cur)
+        # Sprites culled from this frame's list still have last frame's pixels to erase
+        rects.extend(prev_rects.values())
+        if self.hud_rect is not None and (hud_changed or self.hud_rect.collidelist(rects) != -1):
+            rects.append(self.hud_rect)
+        screen_rect = surf.get_rect()
+        rects = [r.clip(screen_rect) for r in rects]
+        rects = [r for r in rects if r.width > 0 and r.height > 0]
+        for r in rects:
+            surf.blit(bg, r, r)
+        self.dirty_rects = rects
+        return rects
+
+    def hud_dirty(self):
+        return self.hud_rect is not None and self.hud_rect in self.dirty_rects
+
+    def end(self, moving, offset=(0, 0)):
+        self._prev_rects = {id(actor): _actor_rect(actor, offset) for actor in moving}
+
+    def present(self):
+        """Push only the dirty rects to the display (for loops that don't flip themselves)."""
+        pygame.display.update(self.dirty_rects)
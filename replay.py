@@ -0,0 +1,212 @@
+"""Deterministic input recording and headless max-speed replay.
+
+A replay holds the pig RNG seed, every key/mouse event handed to game.py,
+the polled arrow-key state before each logic tick and a hash of the game
+state every `hash_every` ticks. Playing it back through sim.py re-runs the
+exact same game as fast as the CPU allows and stops at the first tick whose
+state hash differs from the recording.
+
+Record a live session:    FOX_RECORD=run.fxr pgzrun game.py
+Record a simulated one:   python replay.py record run.fxr --ticks 20000 --seed 3
+Replay / benchmark it:    python replay.py play run.fxr
+
+File layout (little endian):
+    header  "FXRP", version, hash_every, seed, tick count     (4+2+2+8+4 bytes)
+    body    zlib-compressed (tick, kind, a, b) records        (4+1+8+8 bytes each)
+"""
+import hashlib
+import struct
+import time
+import zlib
+
+MAGIC = b"FXRP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHQI")
+_RECORD = struct.Struct("<IBQQ")
+
+# Record kinds. Inputs are tagged with the tick they precede, hashes with
+# the number of ticks completed.
+KEY_DOWN = 0     # a = key value
+KEY_UP = 1       # a = key value
+MOUSE_DOWN = 2   # a, b = position
+HELD = 3         # a = bitmask of HELD_KEYS (only written when it changes)
+HASH = 4         # a = state hash
+
+# Keys Player polls from pgzero's keyboard every tick
+HELD_KEYS = ("left", "right")
+
+
+def held_mask(keyboard):
+    mask = 0
+    for bit, name in enumerate(HELD_KEYS):
+        if getattr(keyboard, name, False):
+            mask |= 1 << bit
+    return mask
+
+
+def state_hash(game):
+    """64-bit digest of the gameplay state of the game module."""
+    p = game.player
+    if game.pig_swarm is not None:
+        # The game only syncs the swarm views it reads; bring them all up to date
+        game.pig_swarm.sync()
+    state = (
+        game.game_state, game.game_over, game.game_win, game.game_paused,
+        game.lives, game.coins_collected, len(game.coins), game.timer, game.invuln_timer,
+        p.left, p.top, p.velocity_x, p.velocity_y, p.jumping, p.alive,
+        tuple((e.left, e.top, e.state, e.velocity_x, e.pause_point, e.pause_timer)
+              for e in game.pig_enemies),
+    )
+    digest = hashlib.blake2b(repr(state).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Recorder(object):
+    """Collects one session's inputs; game.py calls the hooks when game.recorder is set."""
+
+    def __init__(self, seed, hash_every=60):
+        self.seed = seed
+        self.hash_every = hash_every
+        self.tick = 0
+        self.records = []
+        self._held = 0
+
+    def key_down(self, key):
+        self.records.append((self.tick, KEY_DOWN, int(key), 0))
+
+    def key_up(self, key):
+        self.records.append((self.tick, KEY_UP, int(key), 0))
+
+    def mouse_down(self, pos):
+        self.records.append((self.tick, MOUSE_DOWN, int(pos[0]), int(pos[1])))
+
+    def before_step(self, keyboard):
+        mask = held_mask(keyboard)
+        if mask != self._held:
+            self.records.append((self.tick, HELD, mask, 0))
+            self._held = mask
+
+    def after_step(self, game):
+        self.tick += 1
+        if self.tick % self.hash_every == 0:
+            self.records.append((self.tick, HASH, state_hash(game), 0))
+
+    def save(self, path):
+        body = b"".join(_RECORD.pack(*r) for r in self.records)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.hash_every, self.seed, self.tick))
+            f.write(zlib.compress(body, 9))
+
+
+class Replay(object):
+    def __init__(self, seed, hash_every, ticks, records):
+        self.seed = seed
+        self.hash_every = hash_every
+        self.ticks = ticks
+        self.records = records
+
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, hash_every, seed, ticks = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a replay file (or an old version)")
+    body = zlib.decompress(data[_HEADER.size:])
+    records = list(_RECORD.iter_unpack(body))
+    return Replay(seed, hash_every, ticks, records)
+
+
+class Desync(Exception):
+    def __init__(self, tick, expected, got):
+        super().__init__(f"state hash mismatch after tick {tick}: expected {expected:016x}, got {got:016x}")
+        self.tick = tick
+
+
+def play(replay, sim=None):
+    """Re-run replay headless at full speed; returns a summary dict, raises Desync on divergence.
+
+    Like sim.Simulation, this needs the fresh game of a new process.
+    """
+    from sim import Simulation, ScriptedInput
+    sim = sim or Simulation(ScriptedInput({}), seed=replay.seed)
+    game = sim.game
+    keys = sim.keys
+    keyboard = game.keyboard
+    records = replay.records
+    n = len(records)
+    i = 0
+    checked = 0
+    started = time.perf_counter()
+    for tick in range(replay.ticks):
+        while i < n and records[i][0] == tick and records[i][1] != HASH:
+            _, kind, a, b = records[i]
+            if kind == KEY_DOWN:
+                keyboard._press(a)
+                game.on_key_down(keys(a))
+            elif kind == KEY_UP:
+                keyboard._release(a)
+                game.on_key_up(keys(a))
+            elif kind == MOUSE_DOWN:
+                game.on_mouse_down((a, b))
+            elif kind == HELD:
+                for bit, name in enumerate(HELD_KEYS):
+                    value = getattr(keys, name.upper()).value
+                    if a & (1 << bit):
+                        keyboard._press(value)
+                    else:
+                        keyboard._release(value)
+            i += 1
+        game.step()
+        while i < n and records[i][1] == HASH and records[i][0] == tick + 1:
+            got = state_hash(game)
+            if got != records[i][2]:
+                raise Desync(tick + 1, records[i][2], got)
+            checked += 1
+            i += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "ticks": replay.ticks,
+        "seconds": elapsed,
+        "ticks_per_second": replay.ticks / elapsed if elapsed else float("inf"),
+        "hashes_checked": checked,
+        "final_hash": f"{state_hash(game):016x}",
+    }
+
+
+def record(path, ticks, seed=0, hash_every=60, restart=True):
+    """Record a RandomInput session of the headless simulation to path."""
+    from sim import Simulation
+    sim = Simulation(seed=seed)
+    sim.game.recorder = Recorder(seed, hash_every)
+    result = sim.run(ticks, restart=restart)
+    sim.game.recorder.save(path)
+    return result
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Record or replay deterministic game sessions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="record a simulated random session")
+    rec.add_argument("path")
+    rec.add_argument("--ticks", type=int, default=10000)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--hash-every", type=int, default=60)
+    rec.add_argument("--no-restart", action="store_true")
+    ply = sub.add_parser("play", help="replay a recording at maximum speed, checking state hashes")
+    ply.add_argument("path")
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        result = record(args.path, args.ticks, args.seed, args.hash_every, restart=not args.no_restart)
+    else:
+        try:
+            result = play(load_replay(args.path))
+        except Desync as e:
+            raise SystemExit(str(e))
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
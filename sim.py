@@ -0,0 +1,185 @@
+"""Headless, uncapped driver for the game in game.py.
+
+Runs the very same module-level world, Player, PigEnemy and collision code
+that pgzrun drives, but with SDL's dummy video/audio drivers, silent sound
+and music objects, and key events fed from a scripted input source. There is
+no frame cap: each step() runs one fixed logic tick (game.step()) and returns.
+
+    python sim.py --ticks 20000 --seed 1
+
+Only one game can live in a process (game.py keeps its state in module
+globals); use Simulation.restart() between runs.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+GAME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "game.py")
+
+
+class NullAudio(object):
+    """Stands in for pgzero's music and sounds objects: accepts everything, plays nothing."""
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return None
+
+    def is_playing(self, *args):
+        return False
+
+
+class RandomInput(object):
+    """Reproducible random play: new arrow-key choice every `hold` ticks, jumping at random."""
+
+    def __init__(self, seed=0, hold=40, jump_chance=0.4):
+        self.rng = random.Random(seed)
+        self.hold = hold
+        self.jump_chance = jump_chance
+        self._held = None
+
+    def __call__(self, tick):
+        if tick % self.hold:
+            return []
+        events = []
+        r = self.rng.random()
+        held = "left" if r < 0.3 else "right" if r < 0.8 else None
+        if held != self._held:
+            if self._held is not None:
+                events.append(("up", self._held))
+            if held is not None:
+                events.append(("down", held))
+            self._held = held
+        if self.rng.random() < self.jump_chance:
+            events.append(("down", "space"))
+            events.append(("up", "space"))
+        return events
+
+
+class ScriptedInput(object):
+    """Fixed script: {tick: [("down" | "up", key name), ...]}."""
+
+    def __init__(self, script):
+        self.script = script
+
+    def __call__(self, tick):
+        return self.script.get(tick, [])
+
+
+def load_game():
+    """Import game.py headlessly and wire silent audio and a real pgzero keyboard into it."""
+    if "game" in sys.modules:
+        return sys.modules["game"]
+    sys._pgzrun = True  # makes pgzrun.go() at the bottom of game.py a no-op
+    import pygame
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    from pgzero import loaders
+    from pgzero.constants import keys
+    from pgzero.keyboard import keyboard
+    loaders.set_root(GAME_PATH)
+    sys.path.insert(0, os.path.dirname(GAME_PATH))
+    import game
+    game.keyboard = keyboard
+    game.keys = keys
+    game.sounds = NullAudio()
+    game.music = NullAudio()
+    return game
+
+
+class Simulation(object):
+    def __init__(self, inputs=None, seed=0):
+        from pgzero.constants import keys
+        self.game = load_game()
+        self.keys = keys
+        self.inputs = inputs if inputs is not None else RandomInput(seed)
+        self.tick = 0
+        import enemy
+        enemy.rng.seed(seed)
+
+    def _key(self, name):
+        return getattr(self.keys, name.upper())
+
+    def key_down(self, name):
+        key = self._key(name)
+        self.game.keyboard._press(key.value)
+        self.game.on_key_down(key)
+
+    def key_up(self, name):
+        key = self._key(name)
+        self.game.keyboard._release(key.value)
+        self.game.on_key_up(key)
+
+    def start(self):
+        """Leave the menu the way a player would (ENTER)."""
+        if self.game.game_state == "menu":
+            self.key_down("return")
+            self.key_up("return")
+
+    def restart(self):
+        """Back to a fresh level after game over / win, through the same keys a player uses."""
+        g = self.game
+        if g.game_over or g.game_win:
+            self.key_down("return")
+            self.key_up("return")
+        self.start()
+
+    def step(self):
+        for kind, name in self.inputs(self.tick):
+            if kind == "down":
+                self.key_down(name)
+            else:
+                self.key_up(name)
+        self.game.step()
+        self.tick += 1
+
+    def run(self, ticks, restart=True):
+        """Step `ticks` times as fast as possible; returns a summary dict."""
+        self.start()
+        g = self.game
+        runs = 0
+        started = time.perf_counter()
+        for _ in range(ticks):
+            self.step()
+            if restart and (g.game_over or g.game_win):
+                runs += 1
+                self.restart()
+        elapsed = time.perf_counter() - started
+        return {
+            "ticks": ticks,
+            "seconds": elapsed,
+            "ticks_per_second": ticks / elapsed if elapsed else float("inf"),
+            "finished_runs": runs,
+            "lives": g.lives,
+            "coins_collected": g.coins_collected,
+            "player_pos": (g.player.x, g.player.y),
+        }
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the game headless and uncapped.")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-restart", action="store_true", help="stop simulating after game over/win")
+    parser.add_argument("--collision-stats", action="store_true", help="print collision counters per call site")
+    args = parser.parse_args(argv)
+    sim = Simulation(seed=args.seed)
+    if args.collision_stats:
+        import collisions
+        collisions.enable_stats()
+    result = sim.run(args.ticks, restart=not args.no_restart)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    if args.collision_stats:
+        print(collisions.stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Chunk streaming for levels too big to build up front.
+
+ChunkStreamer keeps only the level chunks around the camera as tiles. Each
+frame it asks for the chunks within `radius` chunks of the view; they are
+decoded from the level cache (levelcache stores layers chunk by chunk) on a
+worker thread and turned into Tiles on the main thread, where tile images
+get loaded. Once more than max_chunks are resident, the least recently
+wanted ones are dropped again.
+
+The tiles go into ChunkedLayers, which answer the same grid queries as a
+TileLayer/TileSet, so rendering, physics and collisions work on them
+unchanged and only ever see what is loaded. Each chunk also has its own
+version, so collision masks are baked a chunk at a time and a chunk
+coming or going leaves the others' masks alone.
+
+With NumPy, the streamer keeps a bool grid of resident chunks that the
+pig swarm reads to tell which patrollers to step.
+"""
+import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from platformer import TileSet, TileRun, tile_from_cell
+
+try:
+    import numpy as np
+except ImportError:  # optional: residency is then only asked per actor (is_loaded)
+    np = None
+
+
+class ChunkedLayer(TileSet):
+    """Resident tiles of one level layer, added and dropped a chunk at a time.
+
+    Tiles removed during play (collected coins) are remembered by cell, so
+    an evicted chunk comes back without them; snapshot() and restore() work
+    on that record instead of on the tiles. tile_at() and run_of() read the
+    level itself, so they answer for cells that aren't loaded too.
+    """
+
+    def __init__(self, level, name, tile_size):
+        super().__init__((), tile_size)
+        self.level = level
+        self.name = name
+        self.tile_size = tile_size
+        self.chunk_px = level.chunk * tile_size
+        self.removed = set()  # (col, row) of tiles taken out
+        self.chunk_versions = {}  # (cx, cy) -> layer version when the chunk last changed
+        self._chunks = {}     # (cx, cy) -> every tile of the chunk
+        self._snapshot = set()
+
+    def add_chunk(self, key, tiles):
+        self._chunks[key] = tiles
+        removed = self.removed
+        for tile in tiles:
+            if (tile.col, tile.row) not in removed:
+                self.grid.insert(tile)
+        self.version += 1
+        self.chunk_versions[key] = self.version
+
+    def drop_chunk(self, key):
+        for tile in self._chunks.pop(key, ()):
+            self.grid.discard(tile)
+        self.chunk_versions.pop(key, None)
+        self.version += 1
+
+    def chunks_near(self, rect):
+        """Resident chunks whose tiles may overlap rect (anything with left/top/right/bottom)."""
+        cp = self.chunk_px
+        # Tiles wider or taller than a cell reach into the next cells, as in TileGrid.query_rect
+        ts = self.tile_size
+        cx0 = int(math.floor((rect.left - self.grid._reach_x * ts) / cp))
+        cy0 = int(math.floor((rect.top - self.grid._reach_y * ts) / cp))
+        cx1 = int(math.ceil(rect.right / cp))
+        cy1 = int(math.ceil(rect.bottom / cp))
+        versions = self.chunk_versions
+        return [(cx, cy) for cy in range(cy0, cy1) for cx in range(cx0, cx1) if (cx, cy) in versions]
+
+    def chunk_tiles(self, key):
+        """Tiles of one resident chunk that are in the layer (not taken out)."""
+        tile_at = self.grid.tile_at
+        return [tile for tile in self._chunks.get(key, ()) if tile_at(tile.col, tile.row) is tile]
+
+    def remove(self, item):
+        super().remove(item)
+        self.removed.add((item.col, item.row))
+        key = (item.col // self.level.chunk, item.row // self.level.chunk)
+        if key in self.chunk_versions:
+            self.chunk_versions[key] = self.version
+
+    def discard(self, item):
+        if item in self:
+            self.remove(item)
+
+    def snapshot(self):
+        self._snapshot = set(self.removed)
+
+    def restore(self):
+        self.removed = set(self._snapshot)
+        self.grid.cells.clear()
+        for key, tiles in list(self._chunks.items()):
+            self.add_chunk(key, tiles)
+        self.version += 1
+
+    def tile_at(self, col, row):
+        """Tile at (col, row): the resident one, else a new one from the level (None if empty)."""
+        tile = self.grid.tile_at(col, row)
+        if tile is None:
+            value = self.level.cell(self.name, col, row)
+            if value != -1:
+                tile = tile_from_cell(value, col, row, self.tile_size)
+        return tile
+
+    def run_of(self, tile):
+        """Run the tile belongs to, read from the level (so it doesn't end at unloaded chunks)."""
+        col, row = self.grid.cell_of(tile.left, tile.top)
+        cell = self.level.cell
+        if cell(self.name, col, row) == -1:
+            return None
+        start = end = col
+        while cell(self.name, start - 1, row) != -1:
+            start -= 1
+        while cell(self.name, end + 1, row) != -1:
+            end += 1
+        return TileRun(row, start, end, self.tile_at(start, row), self.tile_at(end, row))
+
+
+class ChunkStreamer(object):
+    """Streams the chunks of a level around a camera into one ChunkedLayer per layer name.
+
+    max_chunks is the memory budget, in chunks (each holds at most
+    level.chunk**2 tiles per layer); chunks in the wanted area are never
+    dropped, so a budget smaller than that area is exceeded rather than
+    thrashed. At most per_update decoded chunks are materialized per
+    update() to keep frames even. workers=0 decodes on the calling thread.
+    """
+
+    def __init__(self, level, names, tile_size, camera, radius=1, max_chunks=64, per_update=4, workers=1):
+        self.level = level
+        self.tile_size = tile_size
+        self.camera = camera
+        self.radius = radius
+        self.max_chunks = max_chunks
+        self.per_update = per_update
+        self.chunk_px = level.chunk * tile_size
+        self.layers = {name: ChunkedLayer(level, name, tile_size) for name in names}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunks") if workers else None
+        self._pending = {}              # key -> Future of _decode(key)
+        self._resident = OrderedDict()  # key -> True, least recently wanted first
+        # loaded[cy, cx] mirrors _resident for vectorized lookups (None without NumPy)
+        self.loaded = np.zeros((level.chunk_rows, level.chunk_cols), dtype=bool) if np is not None else None
+        self.loads = 0
+        self.evictions = 0
+
+    def layer(self, name):
+        return self.layers[name]
+
+    def chunk_of(self, x, y):
+        return int(x // self.chunk_px), int(y // self.chunk_px)
+
+    def wanted(self):
+        """Chunks within radius of the camera view, nearest to its centre first."""
+        view = self.camera.view()
+        r = self.radius
+        cx0, cy0 = self.chunk_of(view.left, view.top)
+        cx1, cy1 = self.chunk_of(view.right - 1, view.bottom - 1)
+        mx, my = (cx0 + cx1) / 2, (cy0 + cy1) / 2
+        keys = [(cx, cy)
+                for cy in range(max(0, cy0 - r), min(self.level.chunk_rows, cy1 + r + 1))
+                for cx in range(max(0, cx0 - r), min(self.level.chunk_cols, cx1 + r + 1))]
+        keys.sort(key=lambda k: (k[0] - mx) ** 2 + (k[1] - my) ** 2)
+        return keys
+
+    def update(self):
+        """Request the wanted chunks, take in finished ones and evict over budget (once per frame)."""
+        want = self.wanted()
+        keep = set(want)
+        for key in want:
+            if key in self._resident:
+                self._resident.move_to_end(key)
+            elif key not in self._pending:
+                self._request(key)
+        taken = 0
+        for key, future in list(self._pending.items()):
+            if key not in keep and future.cancel():
+                del self._pending[key]
+            elif future.done() and taken < self.per_update:
+                del self._pending[key]
+                self._materialize(key, future.result())
+                taken += 1
+        self._evict(keep)
+
+    def load_now(self, keys=None):
+        """Load chunks (default: every wanted one) right away, e.g. for the first frame."""
+        for key in self.wanted() if keys is None else keys:
+            if key in self._resident:
+                continue
+            future = self._pending.pop(key, None)
+            self._materialize(key, future.result() if future is not None else self._decode(key))
+
+    def ensure(self, actor):
+        """Load the chunk under actor now if it isn't resident (so it never stands on nothing)."""
+        key = self.chunk_of(actor.x, actor.y)
+        if key not in self._resident and self._in_level(key):
+            self.load_now([key])
+
+    def is_loaded(self, actor):
+        return self.chunk_of(actor.x, actor.y) in self._resident
+
+    def resident(self):
+        return list(self._resident)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _in_level(self, key):
+        return 0 <= key[0] < self.level.chunk_cols and 0 <= key[1] < self.level.chunk_rows
+
+    def _request(self, key):
+        if self._pool is None:
+            self._materialize(key, self._decode(key))
+        else:
+            self._pending[key] = self._pool.submit(self._decode, key)
+
+    def _decode(self, key):
+        """{layer name: [(col, row, cell value)]} for one chunk; runs on the worker."""
+        cx, cy = key
+        n = self.level.chunk
+        col0, row0 = cx * n, cy * n
+        decoded = {}
+        for name in self.layers:
+            cells = self.level.chunk_cells(name, cx, cy)
+            decoded[name] = [(col0 + i % n, row0 + i // n, value) for i, value in enumerate(cells) if value != -1]
+        return decoded
+
+    def _materialize(self, key, decoded):
+        ts = self.tile_size
+        for name, cells in decoded.items():
+            self.layers[name].add_chunk(key, [tile_from_cell(value, col, row, ts) for col, row, value in cells])
+        self._resident[key] = True
+        if self.loaded is not None:
+            self.loaded[key[1], key[0]] = True
+        self.loads += 1
+
+    def _evict(self, keep):
+        resident = self._resident
+        while len(resident) > self.max_chunks:
+            victim = next((key for key in resident if key not in keep), None)
+            if victim is None:
+                return  # everything resident is wanted
+            del resident[victim]
+            if self.loaded is not None:
+                self.loaded[victim[1], victim[0]] = False
+            for layer in self.layers.values():
+                layer.drop_chunk(victim)
+            self.evictions += 1
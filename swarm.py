@@ -0,0 +1,300 @@
+"""Struct-of-arrays stepping for PigEnemy patrollers.
+
+PatrolSwarm keeps every patroller's position, velocity, bounds, state and
+pause timer in NumPy arrays and advances them all with one vectorized
+step() that follows PigEnemy.move() exactly, down to the float rounding of
+Actor.x and the order random numbers are drawn from enemy.rng. The
+PigEnemy objects stay around as thin views: sync() copies the arrays back
+onto them for drawing, collisions and anything else that reads actors,
+and the game only syncs the ones near the view or the player.
+
+NumPy is optional. Without it `available` is False and the game keeps
+calling PigEnemy.move() per object.
+"""
+import math
+
+from enemy import PAUSE_CHANCE, PAUSE_MIN_SECONDS, PAUSE_MAX_SECONDS
+from timing import ticks
+
+try:
+    import numpy as np
+except ImportError:  # optional: pigs fall back to per-object PigEnemy.move()
+    np = None
+
+available = np is not None
+
+WALK = 0
+IDLE = 1
+
+
+class _MTWords(object):
+    """Raw 32-bit outputs of a random.Random's Mersenne Twister, drawn in bulk.
+
+    NumPy's legacy RandomState runs the same MT19937, so loading the Python
+    generator's state into it yields the very words random.random(),
+    getrandbits() and randint() would consume. commit() advances the Python
+    generator past the words actually used.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+        self._rs = np.random.RandomState()
+        self._start = None
+        self.words = np.empty(0, dtype=np.uint64)
+        self.cursor = 0
+
+    def begin(self, expected):
+        version, internal, gauss = self.rng.getstate()
+        self._start = ("MT19937", np.array(internal[:624], dtype=np.uint32), internal[624], 0, 0.0)
+        self._gauss = (version, gauss)
+        self._rs.set_state(self._start)
+        self.words = self._draw(max(expected, 16))
+        self.cursor = 0
+
+    def _draw(self, n):
+        return self._rs.randint(0, 2 ** 32, size=n, dtype=np.uint32).astype(np.uint64)
+
+    def take(self, n):
+        end = self.cursor + n
+        if end > len(self.words):
+            self.words = np.concatenate((self.words, self._draw(max(n, len(self.words)))))
+        out = self.words[self.cursor:end]
+        self.cursor = end
+        return out
+
+    def randoms(self, n):
+        """Next n values of random.random(), without consuming them yet."""
+        end = self.cursor + 2 * n
+        if end > len(self.words):
+            self.words = np.concatenate((self.words, self._draw(max(2 * n, len(self.words)))))
+        w = self.words[self.cursor:end].reshape(n, 2)
+        return ((w[:, 0] >> 5) * 67108864.0 + (w[:, 1] >> 6)) / 9007199254740992.0
+
+    def skip(self, n):
+        self.cursor += n
+
+    def randint(self, a, b):
+        """random.randint(a, b): getrandbits(k) with rejection, as _randbelow does."""
+        n = b - a + 1
+        k = n.bit_length()
+        while True:
+            r = int(self.take(1)[0]) >> (32 - k)
+            if r < n:
+                return a + r
+
+    def commit(self):
+        if self.cursor != len(self.words):
+            self._rs.set_state(self._start)
+            if self.cursor:
+                self._rs.randint(0, 2 ** 32, size=self.cursor, dtype=np.uint32)
+        _, key, pos, _, _ = self._rs.get_state()
+        version, gauss = self._gauss
+        self.rng.setstate((version, tuple(key.tolist()) + (int(pos),), gauss))
+
+
+class PatrolSwarm(object):
+    def __init__(self, enemies, rng):
+        if np is None:
+            raise RuntimeError("PatrolSwarm needs numpy")
+        self.enemies = list(enemies)
+        self._words = _MTWords(rng)
+        e = self.enemies
+        self.left = np.array([p.left for p in e], dtype=np.float64)
+        self.top = np.array([p.top for p in e], dtype=np.float64)
+        self.ax = np.array([p._anchor[0] for p in e], dtype=np.float64)
+        self.ay = np.array([p._anchor[1] for p in e], dtype=np.float64)
+        self.width = np.array([p.width for p in e], dtype=np.float64)
+        self.height = np.array([p.height for p in e], dtype=np.float64)
+        self.half_w = np.array([p.width // 2 for p in e], dtype=np.float64)
+        self.half_h = np.array([p.height // 2 for p in e], dtype=np.float64)
+        self.speed = np.array([p.speed for p in e], dtype=np.float64)
+        self.velocity_x = np.array([p.velocity_x for p in e], dtype=np.float64)
+        self.dir_sign = np.array([p.dir_sign for p in e], dtype=np.int8)
+        self.flip_x = np.array([bool(p.flip_x) for p in e], dtype=bool)
+        self.state = np.array([IDLE if p.state == "idle" else WALK for p in e], dtype=np.int8)
+        self.pause_point = np.array([np.nan if p.pause_point is None else p.pause_point for p in e],
+                                    dtype=np.float64)
+        self.pause_timer = np.array([p.pause_timer for p in e], dtype=np.int64)
+        self.left_bound = np.array([p.left_bound for p in e], dtype=np.float64)
+        self.right_bound = np.array([p.right_bound for p in e], dtype=np.float64)
+        # Range random pause points are drawn from, as in PigEnemy.move()
+        self.pause_lo = np.array([int(p.left_bound + 2) for p in e], dtype=np.int64)
+        self.pause_hi = np.array([int(p.right_bound - 2) for p in e], dtype=np.int64)
+        self.pause_ticks = (ticks(PAUSE_MIN_SECONDS), ticks(PAUSE_MAX_SECONDS))
+        # Extent of each pig's platform run, for the foot probe
+        self.ground = np.array([(p.run.left, p.run.top, p.run.right, p.run.bottom) for p in e],
+                               dtype=np.float64).reshape(-1, 4).T
+
+    def __len__(self):
+        return len(self.enemies)
+
+    def step(self, active=None):
+        """One PigEnemy.move() for every patroller (or only where the `active` mask is set)."""
+        n = len(self.enemies)
+        if not n:
+            return
+        state = self.state
+        idle = state == IDLE
+        walk = ~idle
+        if active is not None:
+            active = np.asarray(active, dtype=bool)
+            idle &= active
+            walk &= active
+
+        # Idle: count the pause down, then walk on in the remembered direction
+        ticking = idle & (self.pause_timer > 0)
+        self.pause_timer[ticking] -= 1
+        wake = idle & (self.pause_timer <= 0)
+        if wake.any():
+            state[wake] = WALK
+            self.velocity_x[wake] = self.speed[wake] * self.dir_sign[wake]
+            self.flip_x[wake] = self.dir_sign[wake] < 0
+            self.pause_point[wake] = np.nan
+
+        w = np.flatnonzero(walk)
+        if not len(w):
+            return
+        ax = self.ax[w]
+        vx = self.velocity_x[w]
+        # Same float steps as Actor.x += velocity_x (x is left + anchor)
+        left = ((self.left[w] + ax) + vx) - ax
+        x = left + ax
+        y = self.top[w] + self.ay[w]
+        foot_x = np.where(vx < 0, x - self.half_w[w], x + self.half_w[w])
+        foot_y = y + self.half_h[w] + 2
+        flip = self.flip_x[w]
+        pp = self.pause_point[w]
+        dir_sign = self.dir_sign[w]
+
+        g_left, g_top, g_right, g_bottom = self.ground[:, w]
+        off = ~((g_left <= foot_x) & (foot_x < g_right) & (g_top <= foot_y) & (foot_y < g_bottom))
+        vx = np.where(off, -vx, vx)
+        dir_sign = np.where(off, np.where(vx > 0, 1, -1), dir_sign)
+        flip = np.where(off, ~flip, flip)
+        pp = np.where(off, np.nan, pp)
+
+        lb = self.left_bound[w]
+        under = (left + ax) < lb
+        left = np.where(under, lb - ax, left)
+        vx = np.where(under, np.abs(vx), vx)
+        dir_sign = np.where(under, 1, dir_sign)
+        flip = np.where(under, False, flip)
+        pp = np.where(under, np.nan, pp)
+
+        rb = self.right_bound[w]
+        over = (left + ax) > rb
+        left = np.where(over, rb - ax, left)
+        vx = np.where(over, -np.abs(vx), vx)
+        dir_sign = np.where(over, -1, dir_sign)
+        flip = np.where(over, True, flip)
+        pp = np.where(over, np.nan, pp)
+
+        self.left[w] = left
+        self.velocity_x[w] = vx
+        self.dir_sign[w] = dir_sign
+        self.flip_x[w] = flip
+        self.pause_point[w] = pp
+
+        # Random pauses. Walkers without a pause point each draw random(); the
+        # few that roll under PAUSE_CHANCE draw a point with randint(), and
+        # walkers reaching their point draw a pause length. Those draws are
+        # interleaved in enemy order, exactly as the per-object loop makes them.
+        x = left + ax
+        has_point = ~np.isnan(pp)
+        arrived = has_point & (((vx > 0) & (x >= pp)) | ((vx < 0) & (x <= pp)))
+        rolling = ~has_point
+        order = np.flatnonzero(rolling | arrived)
+        if not len(order):
+            return
+        words = self._words
+        words.begin(2 * int(rolling.sum()) + 8 * int(arrived.sum()) + 64)
+        is_roll = rolling[order]
+        arrival_at = np.flatnonzero(~is_roll)
+        i = 0
+        m = len(order)
+        while i < m:
+            k = np.searchsorted(arrival_at, i)
+            run_end = arrival_at[k] if k < len(arrival_at) else m
+            if i == run_end:
+                self._pause(w[order[i]], words)
+                i += 1
+                continue
+            count = min(run_end - i, 512)
+            hits = np.flatnonzero(words.randoms(count) < PAUSE_CHANCE)
+            if not len(hits):
+                words.skip(2 * count)
+                i += count
+                continue
+            h = int(hits[0])
+            words.skip(2 * (h + 1))
+            pig = w[order[i + h]]
+            lo, hi = int(self.pause_lo[pig]), int(self.pause_hi[pig])
+            if hi >= lo:
+                point = words.randint(lo, hi)
+                self.pause_point[pig] = point
+                v = self.velocity_x[pig]
+                px = self.left[pig] + self.ax[pig]
+                if (v > 0 and px >= point) or (v < 0 and px <= point):
+                    self._pause(pig, words)
+            i += h + 1
+        words.commit()
+
+    def _pause(self, pig, words):
+        v = self.velocity_x[pig]
+        self.state[pig] = IDLE
+        self.dir_sign[pig] = 1 if v > 0 else -1
+        self.velocity_x[pig] = 0.0
+        self.pause_timer[pig] = words.randint(*self.pause_ticks)
+        self.flip_x[pig] = self.dir_sign[pig] < 0
+
+    def in_chunks(self, loaded, chunk_px):
+        """Mask of the patrollers whose position (Actor.x, Actor.y) lies in a chunk set in loaded[cy, cx].
+
+        The vectorized form of ChunkStreamer.is_loaded() over the swarm, for step(active).
+        """
+        cx = ((self.left + self.ax) // chunk_px).astype(np.intp)
+        cy = ((self.top + self.ay) // chunk_px).astype(np.intp)
+        rows, cols = loaded.shape
+        inside = (cx >= 0) & (cx < cols) & (cy >= 0) & (cy < rows)
+        active = np.zeros(len(self.enemies), dtype=bool)
+        active[inside] = loaded[cy[inside], cx[inside]]
+        return active
+
+    def sync(self, indices=None):
+        """Copy swarm state onto the PigEnemy views (all of them, or just `indices`)."""
+        enemies = self.enemies
+        if indices is None:
+            indices = slice(None)
+            order = range(len(enemies))
+        else:
+            indices = np.asarray(indices, dtype=np.intp)
+            order = indices.tolist()
+        # One tolist() per array rather than a NumPy scalar per attribute
+        rows = zip(order, self.left[indices].tolist(), (self.state[indices] == IDLE).tolist(),
+                   self.velocity_x[indices].tolist(), self.dir_sign[indices].tolist(),
+                   self.flip_x[indices].tolist(), self.pause_point[indices].tolist(),
+                   self.pause_timer[indices].tolist())
+        for i, left, idle, vx, dir_sign, flip, pp, timer in rows:
+            pig = enemies[i]
+            # Plain attributes go straight into __dict__: Actor.__setattr__ checks every
+            # name against the rect attributes first, which costs more than the copy
+            attrs = pig.__dict__
+            attrs["_rect"].left = left
+            attrs["state"] = "idle" if idle else "walk"
+            sprite = pig.idle_sprite if idle else pig.walk_sprite
+            if sprite is not attrs["_sprite"]:
+                pig.sprite = sprite
+            attrs["velocity_x"] = vx
+            attrs["dir_sign"] = dir_sign
+            attrs["_flip_x"] = flip
+            attrs["pause_point"] = None if math.isnan(pp) else int(pp)
+            attrs["pause_timer"] = timer
+
+    def near(self, rect):
+        """Views of the patrollers whose boxes overlap rect, synced first."""
+        right = self.left + self.width
+        bottom = self.top + self.height
+        hit = np.flatnonzero((self.left < rect.right) & (right > rect.left)
+                             & (self.top < rect.bottom) & (bottom > rect.top))
+        self.sync(hit)
+        return [self.enemies[i] for i in hit]
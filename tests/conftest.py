@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+def _run_headless(script, *args, timeout=300):
+    """Run script in a fresh interpreter from the repo root and return its stdout.
+
+    game.py keeps its world in module globals, so every test that plays the
+    game gets a process of its own.
+    """
+    proc = subprocess.run([sys.executable, "-c", script, *map(str, args)], cwd=ROOT,
+                          capture_output=True, text=True, timeout=timeout)
+    if proc.returncode != 0:
+        raise AssertionError(f"headless run failed:\n{proc.stderr}")
+    return proc.stdout
+
+
+@pytest.fixture
+def run_headless():
+    return _run_headless
+
+
+@pytest.fixture(scope="session")
+def images():
+    """pgzero's image loader pointed at the game's images, with a (dummy) display to convert them for."""
+    import pygame
+    from pgzero import loaders
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    loaders.set_root(os.path.join(ROOT, "game.py"))
+    return loaders.images
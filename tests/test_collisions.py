@@ -0,0 +1,242 @@
+"""The mask collision path against the per-pixel get_at() scan it replaced."""
+import os
+import random
+
+import pygame
+import pytest
+
+import collisions
+import platformer
+from conftest import ROOT
+
+FRAME_INSET = (4, 3)   # _inset_for() of animated actors
+TILE_INSET = (1, 1)    # _inset_for() of everything else
+TS = 21
+LAYERS = ("platformer", "obstacles", "coins", "cenario")
+# The game's sprite strips: (sheet, first frame rect, frame count)
+STRIPS = {
+    "fox_walk": ("fox", (0, 64, 32, 32), 8),
+    "fox_idle": ("fox", (0, 32, 32, 32), 14),
+    "pig_walk": ("pig", (0, 0, 32, 32), 5),
+    "pig_idle": ("pig", (0, 32, 32, 32), 5),
+}
+ORIGINS = ((100, 60), (100.25, 60.75), (-7.5, -3.25))
+SAMPLES = 24  # offsets checked per pair and origin
+
+
+class Body(object):
+    """Bare stand-in for an actor or tile: a surface at a (possibly fractional) position.
+
+    Animated bodies answer current_frame() like a SpriteActor, so collisions
+    gives them the sprite inset.
+    """
+
+    def __init__(self, surf, left, top, animated=False):
+        self._surf = surf
+        self.sprite = animated
+        self.inset = FRAME_INSET if animated else TILE_INSET
+        self.left = left
+        self.top = top
+        w, h = surf.get_size()
+        self.right = left + w
+        self.bottom = top + h
+
+    def current_frame(self):
+        return self._surf
+
+    def colliderect(self, other):
+        return (self.left < other.right and other.left < self.right
+                and self.top < other.bottom and other.top < self.bottom)
+
+
+def _opaque(c):
+    if len(c) == 4:
+        return c[3] >= 192
+    return tuple(c[:3]) != (0, 0, 0)
+
+
+def _opacity(surf):
+    """_opaque() of every pixel, read once with get_at() as the original scan did."""
+    sw, sh = surf.get_size()
+    return [[_opaque(surf.get_at((x, y))) for x in range(sw)] for y in range(sh)]
+
+
+def _bbox(opacity):
+    pts = [(x, y) for y, row in enumerate(opacity) for x, solid in enumerate(row) if solid]
+    if not pts:
+        return None
+    return (min(x for x, _ in pts), min(y for _, y in pts),
+            max(x for x, _ in pts) + 1, max(y for _, y in pts) + 1)
+
+
+def reference_collide(a, b, pixels, insets=None):
+    """The original pixel scan of collisions._pixel_perfect_collide, on the surfaces as loaded.
+
+    pixels maps id(surface) to its (_opacity(), _bbox()).
+    """
+    left = int(max(a.left, b.left))
+    top = int(max(a.top, b.top))
+    right = int(min(a.right, b.right))
+    bottom = int(min(a.bottom, b.bottom))
+    if left >= right or top >= bottom:
+        return False
+    sa, sb = a._surf, b._surf
+    aw, ah = sa.get_size()
+    bw, bh = sb.get_size()
+    (op_a, bb_a), (op_b, bb_b) = pixels[id(sa)], pixels[id(sb)]
+    if bb_a is None or bb_b is None:
+        return False
+    left = max(left, int(max(a.left + bb_a[0], b.left + bb_b[0])))
+    top = max(top, int(max(a.top + bb_a[1], b.top + bb_b[1])))
+    right = min(right, int(min(a.left + bb_a[2], b.left + bb_b[2])))
+    bottom = min(bottom, int(min(a.top + bb_a[3], b.top + bb_b[3])))
+    (aix, aiy), (bix, biy) = insets or (a.inset, b.inset)
+    for y in range(top, bottom):
+        ay = y - a.top
+        by = y - b.top
+        for x in range(left, right):
+            ax = x - a.left
+            bx = x - b.left
+            if ax < aix or ay < aiy or ax >= aw - aix or ay >= ah - aiy:
+                continue
+            if bx < bix or by < biy or bx >= bw - bix or by >= bh - biy:
+                continue
+            iax, iay, ibx, iby = int(ax), int(ay), int(bx), int(by)
+            if iax < 0 or iay < 0 or iax >= aw or iay >= ah:
+                continue
+            if ibx < 0 or iby < 0 or ibx >= bw or iby >= bh:
+                continue
+            if op_a[iay][iax] and op_b[iby][ibx]:
+                return True
+    return False
+
+
+def _level_tiles():
+    """Every (tile id, flip bits) the level's layers use, from the shipped CSVs."""
+    found = set()
+    for name in LAYERS:
+        for tile in platformer.build(os.path.join(ROOT, f"platformer_{name}.csv"), TS):
+            found.add((name, tile.proto.tile_id, tile.proto.flips))
+    return sorted(found)
+
+
+@pytest.fixture(scope="module")
+def art(images):
+    """{name: (surface as loaded, surface as the game holds it)} for every sprite frame and level tile.
+
+    Frames are named "<strip>/<index>" with a "/left" suffix for the mirrored
+    facing, tiles "tile/<layer>/<id>".
+    """
+    found = {}
+    for strip, (sheet, rect, count) in STRIPS.items():
+        raw = images.load(f"sprites/{sheet}")
+        sprite = platformer.Sprite(f"{sheet}.png", rect, count, (0, 0, 0), 1, left_rect=rect)
+        for i in range(count):
+            loaded = raw.subsurface((rect[0] + i * rect[2], rect[1], rect[2], rect[3]))
+            found[f"{strip}/{i}"] = (loaded, sprite.frame(i))
+            found[f"{strip}/{i}/left"] = (pygame.transform.flip(loaded, True, False), sprite.frame(i, left=True))
+    for layer, tile_id, flips in _level_tiles():
+        proto = platformer.tile_proto(tile_id, flips)
+        loaded = platformer.orient_tile(images.load(proto.image), flips)
+        found[f"tile/{layer}/{tile_id}" + (f"/{flips:x}" if flips else "")] = (loaded, proto.surf)
+    # Not in this level, but the loader orients flipped TMX cells the same way
+    flipped = platformer.orient_tile(images.load("tiles/tile_0150"), platformer.FLIPPED_D)
+    found["tile/rotated/150"] = (flipped, platformer.display_format(flipped))
+    return found
+
+
+@pytest.fixture(scope="module")
+def pixels(art):
+    found = {}
+    for loaded, _ in art.values():
+        opacity = _opacity(loaded)
+        found[id(loaded)] = (opacity, _bbox(opacity))
+    return found
+
+
+def test_art_covers_the_game(art):
+    frames = sum(count for _, _, count in STRIPS.values())
+    assert sum(name.startswith(tuple(STRIPS)) for name in art) == 2 * frames == 64
+    tiles = {name.split("/")[2] for name in art if name.startswith("tile/") and "/rotated/" not in name}
+    assert tiles == {"12", "17", "18", "34", "42", "46", "48", "70", "78", "121", "122", "123", "124",
+                     "150", "151", "154", "191", "192", "456", "457", "459", "460"}
+
+
+def _pairs(art):
+    """What the fox is tested against in the game, over every frame and facing."""
+    fox = [name for name in art if name.startswith("fox_")]
+    pigs = [name for name in art if name.startswith("pig_")]
+    tiles = [name for name in art if name.startswith("tile/")]
+    for a in fox:
+        for b in pigs + tiles:
+            yield a, b, collisions.pixel_perfect_collide, None
+        for b in tiles:
+            if b.startswith("tile/platformer/"):
+                yield a, b, collisions.platform_collide, ((0, 0), (0, 0))
+
+
+def _offsets(origin, rng, count=SAMPLES):
+    """count positions around origin: integer steps from an integer origin, quarter pixels otherwise."""
+    x, y = origin
+    fractions = (0,) if origin == ORIGINS[0] else (0, 0.25, 0.5, 0.75)
+    steps = range(-33, 34, 3)
+    for _ in range(count):
+        yield x + rng.choice(steps) + rng.choice(fractions), y + rng.choice(steps) + rng.choice(fractions)
+
+
+@pytest.mark.parametrize("origin", ORIGINS)
+def test_pair_masks_match_pixel_scan(art, pixels, origin):
+    rng = random.Random(repr(origin))
+    checked = hits = 0
+    for name_a, name_b, collide, insets in _pairs(art):
+        loaded_a, game_a = art[name_a]
+        loaded_b, game_b = art[name_b]
+        x, y = origin
+        for bx, by in _offsets(origin, rng):
+            expected = reference_collide(Body(loaded_a, x, y, True), Body(loaded_b, bx, by), pixels, insets)
+            got = collide(Body(game_a, x, y, True), Body(game_b, bx, by))
+            assert got == expected, (name_a, name_b, (x, y), (bx, by))
+            checked += 1
+            hits += got
+    # Both outcomes are exercised
+    assert 0 < hits < checked
+
+
+@pytest.mark.parametrize("origin", ORIGINS)
+def test_layer_mask_matches_pixel_scan(art, pixels, origin):
+    rng = random.Random(repr(origin))
+    # A 3x2 block of different tiles on the 21 px grid, with gaps
+    x, y = origin
+    cells = [(0, 0, "tile/obstacles/12"), (1, 0, "tile/rotated/150"), (2, 0, "tile/coins/78"),
+             (0, 1, "tile/platformer/121"), (2, 1, "tile/cenario/46")]
+    loaded_layer = [Body(art[name][0], int(x) + c * TS, int(y) + r * TS) for c, r, name in cells]
+    game_layer = [Body(art[name][1], int(x) + c * TS, int(y) + r * TS) for c, r, name in cells]
+    checked = hits = 0
+    for name in art:
+        if not name.startswith(tuple(STRIPS)):
+            continue
+        loaded, game = art[name]
+        for ax, ay in _offsets((x + 20, y + 10), rng, 4 * SAMPLES):
+            expected = any(reference_collide(Body(loaded, ax, ay, True), tile, pixels) for tile in loaded_layer)
+            got = collisions.any_hit_layer(Body(game, ax, ay, True), game_layer)
+            assert got == expected, (name, (ax, ay))
+            checked += 1
+            hits += got
+    assert 0 < hits < checked
+
+
+def test_converted_art_keeps_its_masks(art):
+    for name, (loaded, game) in art.items():
+        a, b = collisions.surface_mask(loaded), collisions.surface_mask(game)
+        assert a.count() == b.count() == a.overlap_area(b, (0, 0)), name
+        assert collisions.alpha_bbox(loaded) == collisions.alpha_bbox(game), name
+
+
+def test_black_stays_solid_in_opaque_art(images):
+    surf = pygame.Surface((8, 8), pygame.SRCALPHA)
+    surf.fill((200, 30, 30, 255))
+    surf.fill((0, 0, 0, 255), (0, 0, 8, 3))
+    converted = platformer.display_format(surf)
+    assert not converted.get_flags() & pygame.SRCALPHA
+    assert collisions.surface_mask(converted).count() == 64
+    assert collisions.alpha_bbox(converted) == (0, 0, 8, 8)
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+from conftest import ROOT
+from levelcache import load_level
+
+
+def _map_copy(tmp_path):
+    for name in ("platformer.tmx", "platformer.tsx"):
+        shutil.copy(os.path.join(ROOT, name), tmp_path / name)
+    return str(tmp_path / "platformer.tmx"), str(tmp_path / "platformer.level")
+
+
+def _age(path, seconds):
+    t = os.path.getmtime(path) - seconds
+    os.utime(path, (t, t))
+
+
+def test_tmx_cache_is_rebuilt_when_its_tileset_changes(tmp_path):
+    tmx, cache = _map_copy(tmp_path)
+    load_level(tmx, cache).close()
+    _age(cache, 100)
+    _age(tmx, 200)
+    _age(tmp_path / "platformer.tsx", 200)
+    built = os.path.getmtime(cache)
+    load_level(tmx, cache).close()
+    assert os.path.getmtime(cache) == built  # nothing newer: the cache is used as is
+
+    os.utime(tmp_path / "platformer.tsx")
+    load_level(tmx, cache).close()
+    assert os.path.getmtime(cache) > built
+
+
+def test_tmx_cache_is_rebuilt_when_layer_names_differ(tmp_path):
+    tmx, cache = _map_copy(tmp_path)
+    level = load_level(tmx, cache)
+    assert list(level.layers) == ["platformer", "cenario", "coins", "obstacles"]
+    level.close()
+    with open(tmx) as f:
+        text = f.read()
+    with open(tmx, "w") as f:
+        f.write(text.replace('name="coins"', 'name="gems"'))
+    # The edited map is no newer than the cache: only the names give it away
+    _age(tmx, 100)
+    level = load_level(tmx, cache)
+    assert list(level.layers) == ["platformer", "cenario", "gems", "obstacles"]
+    level.close()
@@ -0,0 +1,65 @@
+import pytest
+
+from physics import Box, move_box, solid_box
+from platformer import build_layer
+
+TS = 21
+COLS, ROWS = 14, 10
+W, H = 16, 20  # the moving box
+
+
+@pytest.fixture
+def level(images):
+    # A one-tile-thick platform across row 5 (cols 0-3) and a one-tile-thick wall down col 8
+    cells = [-1] * (COLS * ROWS)
+    for col in range(4):
+        cells[5 * COLS + col] = 34
+    for row in range(ROWS):
+        cells[row * COLS + 8] = 34
+    return build_layer(cells, COLS, TS)
+
+
+def _box(left, top):
+    return Box(left, top, left + W, top + H)
+
+
+def test_fast_fall_lands_on_thin_platform(level):
+    floor = solid_box(level.tile_at(1, 5))
+    # Far more than a tile per tick: without the sweep the box would end up below the platform
+    dy = 130
+    assert 10 + dy > floor.bottom
+    left, top, contacts = move_box(level, _box(20, 10), 0, dy)
+    assert (left, top) == (20, floor.top - H)
+    assert contacts.grounded and contacts.ground.row == 5
+    assert contacts.ceiling is None and contacts.wall_left is None and contacts.wall_right is None
+    # Standing still on it next tick still reports ground
+    left, top, contacts = move_box(level, _box(left, top), 0, 0)
+    assert top == floor.top - H and contacts.grounded
+
+
+def test_fast_jump_stops_under_thin_platform(level):
+    ceiling = solid_box(level.tile_at(1, 5))
+    dy = -100
+    assert 180 + H + dy < ceiling.top
+    left, top, contacts = move_box(level, _box(20, 180), 0, dy)
+    assert (left, top) == (20, ceiling.bottom)
+    assert contacts.ceiling is not None and contacts.ceiling.row == 5
+    assert not contacts.grounded
+
+
+@pytest.mark.parametrize("start, dx", [(100, 100), (260, -120)])
+def test_fast_run_stops_at_thin_wall(level, start, dx):
+    wall = solid_box(level.tile_at(8, 1))
+    # Unswept, the box would end up clear on the far side of the wall
+    assert start + dx > wall.right if dx > 0 else start + W + dx < wall.left
+    left, top, contacts = move_box(level, _box(start, 20), dx, 0)
+    assert top == 20
+    if dx > 0:
+        assert left + W == wall.left
+        assert contacts.wall_right is not None and contacts.wall_right.col == 8
+        assert contacts.wall_left is None
+    else:
+        assert left == wall.right
+        assert contacts.wall_left is not None and contacts.wall_left.col == 8
+        assert contacts.wall_right is None
+    assert not contacts.grounded
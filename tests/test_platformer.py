@@ -0,0 +1,77 @@
+import pytest
+
+import collisions
+from platformer import TileLayer, as_layer, build_layer, run_of, tile_from_cell
+
+TS = 21
+
+
+@pytest.fixture
+def layer(images):
+    # Row 0: a run of three tiles and a lone one; row 1: a run of two
+    return build_layer([121, 122, 123, -1, 150,
+                        -1, 34, 34, -1, -1], 5, TS)
+
+
+def test_run_of_reads_the_layer_index(layer):
+    run = run_of(layer, layer.tile_at(1, 0))
+    assert (run.row, run.start_col, run.end_col) == (0, 0, 2)
+    assert run.first is layer.tile_at(0, 0) and run.last is layer.tile_at(2, 0)
+    lone = run_of(layer, layer.tile_at(4, 0))
+    assert (lone.start_col, lone.end_col) == (4, 4)
+
+
+def test_run_of_wants_a_layer(layer):
+    tiles = list(layer)
+    with pytest.raises(TypeError):
+        run_of(tiles, tiles[0])
+    wrapped = as_layer(tiles, TS)
+    assert isinstance(wrapped, TileLayer)
+    assert as_layer(wrapped, TS) is wrapped
+    assert run_of(wrapped, tiles[0]).end_col == 2
+
+
+def test_run_of_tile_outside_the_layer(layer):
+    stray = tile_from_cell(121, 3, 1, TS)
+    with pytest.raises(ValueError):
+        run_of(layer, stray)
+    assert layer.run_of(stray) is None  # the layer itself just has no run for it
+
+
+def _replace_one(layer):
+    layer[1] = tile_from_cell(42, 3, 0, TS)
+
+
+def _replace_slice(layer):
+    layer[0:2] = [tile_from_cell(12, 3, 1, TS), tile_from_cell(70, 4, 1, TS), tile_from_cell(78, 0, 1, TS)]
+
+
+def _delete_one(layer):
+    del layer[0]
+
+
+def _delete_slice(layer):
+    del layer[1:4]
+
+
+def _add_in_place(layer):
+    layer += [tile_from_cell(17, 3, 0, TS), tile_from_cell(17, 0, 1, TS)]
+
+
+@pytest.mark.parametrize("mutate", [
+    _replace_one, _replace_slice, _delete_one, _delete_slice, _add_in_place,
+    lambda layer: layer.append(tile_from_cell(46, 3, 0, TS)),
+    lambda layer: layer.remove(layer[2]),
+    lambda layer: layer.pop(),
+])
+def test_baked_mask_follows_every_mutation(layer, mutate):
+    collisions.layer_mask(layer)  # bake before the change
+    version = layer.version
+    mutate(layer)
+    assert layer.version != version
+    assert {id(t) for t in layer.grid.cells.values()} == {id(t) for t in layer}
+
+    mask, ox, oy = collisions.layer_mask(layer)
+    fresh, fx, fy = collisions.layer_mask(TileLayer(list(layer), TS))
+    assert (ox, oy, mask.get_size()) == (fx, fy, fresh.get_size())
+    assert mask.count() == fresh.count() == mask.overlap_area(fresh, (0, 0))
@@ -0,0 +1,83 @@
+import os
+import random
+
+import pygame
+import pytest
+
+from background import Backdrop
+from camera import Camera
+from conftest import ROOT
+from platformer import build
+from render import StaticLayerCache
+
+TS = 21
+
+
+@pytest.fixture(scope="module")
+def layers(images):
+    return [build(os.path.join(ROOT, f"platformer_{name}.csv"), TS) for name in ("platformer", "obstacles", "cenario")]
+
+
+@pytest.mark.parametrize("parallax", [1.0, 0.5])
+def test_scrolling_view_is_redrawn_in_place(layers, parallax):
+    world = (50 * TS, 30 * TS)
+    sky = (Backdrop("sky", fallback_color="skyblue", parallax=parallax),)
+    full = StaticLayerCache(world, layers, backdrops=sky).surface()
+    camera = Camera((400, 300), world)
+    cache = StaticLayerCache((400, 300), layers, backdrops=sky, camera=camera, chunk_size=128)
+    surf = cache.surface()
+    rng = random.Random(2)
+    for _ in range(30):
+        camera.x, camera.y = rng.randrange(world[0] - 400), rng.randrange(world[1] - 300)
+        version = cache.version
+        assert cache.surface() is surf
+        assert cache.version == version + 1
+        assert cache.surface() is surf and cache.version == version + 1  # still camera: no redraw
+        if parallax == 1:
+            expected = full.subsurface((camera.x, camera.y, 400, 300))
+            assert pygame.image.tobytes(surf, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+
+FRAMES = """
+import hashlib
+import sys
+import pygame
+import pgzero.game
+from pgzero.screen import Screen
+from sim import Simulation, RandomInput
+from timing import TICK
+
+dirty, frames = sys.argv[1] == "dirty", int(sys.argv[2])
+sim = Simulation(RandomInput(3, hold=20), seed=3)
+game = sim.game
+display = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+pgzero.game.screen = display
+game.screen = Screen(display)
+game.DIRTY_RECT_RENDERING = dirty
+shown = pygame.Surface(display.get_size())  # what the monitor would show
+sim.start()
+for frame in range(frames):
+    for kind, name in sim.inputs(frame):
+        (sim.key_down if kind == "down" else sim.key_up)(name)
+    game.update(TICK)
+    game.draw()
+    if dirty:
+        game.dirty_renderer.present()
+        for r in game.dirty_renderer.dirty_rects:
+            shown.blit(display, r, r)
+        # Everything that changed on screen lies in the rects present() pushes
+        assert pygame.image.tobytes(shown, "RGB") == pygame.image.tobytes(display, "RGB"), frame
+    else:
+        pygame.display.flip()
+    if game.game_over or game.game_win:
+        sim.restart()
+    print(hashlib.md5(pygame.image.tobytes(display, "RGB")).hexdigest())
+"""
+
+
+def test_dirty_rect_frames_match_full_frames(run_headless):
+    full = run_headless(FRAMES, "full", 400).split()
+    dirty = run_headless(FRAMES, "dirty", 400).split()
+    assert len(full) == len(dirty) == 400
+    first = next((i for i, (a, b) in enumerate(zip(full, dirty)) if a != b), None)
+    assert first is None, f"dirty-rect frame {first} differs"
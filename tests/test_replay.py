@@ -0,0 +1,31 @@
+import replay
+
+RECORD_FROM_MENU_CLICK = """
+import sys
+import menu
+import replay
+from sim import Simulation, ScriptedInput
+
+script = {5: [("down", "right")], 40: [("down", "space"), ("up", "space")], 120: [("up", "right")]}
+sim = Simulation(ScriptedInput(script), seed=5)
+game = sim.game
+game.recorder = replay.Recorder(5, hash_every=20)
+# Click START on the menu before anything has been drawn, as a replay would
+start = menu.get_buttons((game.WIDTH, game.HEIGHT))["start"]
+game.on_mouse_down(start.center)
+assert game.game_state == "playing"
+for _ in range(200):
+    sim.step()
+game.recorder.save(sys.argv[1])
+"""
+
+
+def test_replay_starting_with_menu_click(tmp_path, run_headless):
+    path = tmp_path / "click.fxr"
+    run_headless(RECORD_FROM_MENU_CLICK, path)
+    recording = replay.load_replay(path)
+    assert recording.records[0][1] == replay.MOUSE_DOWN
+
+    # A fresh process never draws the menu, so the click must resolve without it
+    out = run_headless("import replay; replay.main()", "play", path)
+    assert "hashes_checked: 10" in out
@@ -0,0 +1,56 @@
+TRACE = """
+import sys
+import replay
+from sim import Simulation, RandomInput
+from timing import TICK
+
+mode, ticks = sys.argv[1], int(sys.argv[2])
+sim = Simulation(RandomInput(11, hold=25), seed=11)
+game = sim.game
+if mode == "live":
+    import pygame
+    import pgzero.game
+    from pgzero.screen import Screen
+    surf = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+    pgzero.game.screen = surf
+    game.screen = Screen(surf)
+sim.start()
+for tick in range(ticks):
+    if mode == "sim":
+        sim.step()
+    else:
+        # What pgzrun does per frame: inputs, update(dt) covering one tick, draw()
+        for kind, name in sim.inputs(tick):
+            (sim.key_down if kind == "down" else sim.key_up)(name)
+        game.update(TICK)
+        game.draw()
+    if game.game_over or game.game_win:
+        sim.restart()
+    print(f"{replay.state_hash(game):016x}")
+"""
+
+
+def test_sim_step_matches_live_update_and_draw(run_headless):
+    ticks = 1500
+    simulated = run_headless(TRACE, "sim", ticks).split()
+    live = run_headless(TRACE, "live", ticks).split()
+    assert len(simulated) == len(live) == ticks
+    first = next((i for i, (a, b) in enumerate(zip(simulated, live)) if a != b), None)
+    assert first is None, f"sim and live diverge at tick {first + 1}"
+
+
+STATS = """
+import collisions
+from sim import Simulation
+
+sim = Simulation(seed=2)
+stats = collisions.enable_stats(history=1000)
+sim.run(300)
+print(len(stats.frames), " ".join(sorted(stats.totals)))
+"""
+
+
+def test_collision_stats_get_a_row_per_tick(run_headless):
+    rows, *sites = run_headless(STATS).split()
+    assert int(rows) == 300
+    assert "platforms" in sites and "obstacles" in sites and "other" not in sites
@@ -0,0 +1,80 @@
+import os
+import random
+
+import pytest
+
+import collisions
+from camera import Camera
+from conftest import ROOT
+from levelcache import Level, compile_level
+from platformer import TileLayer
+from streaming import ChunkStreamer
+
+TS = 21
+
+
+class Body(object):
+    """An animated actor's frame at a position, enough for any_hit_layer()."""
+
+    def __init__(self, surf, left, top):
+        self._surf = surf
+        self.sprite = True
+        self.left, self.top = left, top
+        w, h = surf.get_size()
+        self.right, self.bottom = left + w, top + h
+
+    def current_frame(self):
+        return self._surf
+
+
+@pytest.fixture
+def streamer(images):
+    # The shipped level in 8x8-cell chunks, decoded on the calling thread
+    sources = {name: os.path.join(ROOT, f"platformer_{name}.csv") for name in ("platformer", "obstacles")}
+    level = Level(compile_level(sources, chunk=8))
+    camera = Camera((200, 200), (level.cols * TS, level.rows * TS))
+    streamer = ChunkStreamer(level, ("platformer", "obstacles"), TS, camera, max_chunks=100, workers=0)
+    yield streamer
+    streamer.close()
+
+
+def test_chunk_masks_match_the_whole_layer(streamer, images):
+    level = streamer.level
+    streamer.load_now([(cx, cy) for cy in range(level.chunk_rows) for cx in range(level.chunk_cols)])
+    chunked = streamer.layer("obstacles")
+    whole = TileLayer(list(chunked), TS)
+    frame = images.load("sprites/fox").subsurface((0, 64, 32, 32))
+    rng = random.Random(4)
+    hits = 0
+    for _ in range(3000):
+        body = Body(frame, rng.uniform(-20, level.cols * TS), rng.uniform(-20, level.rows * TS))
+        got = collisions.any_hit_layer(body, chunked)
+        assert got == collisions.any_hit_layer(body, whole), (body.left, body.top)
+        hits += got
+    assert hits
+
+
+def test_chunk_changes_rebake_only_that_chunk(streamer):
+    streamer.load_now([(0, 3), (1, 3)])
+    layer = streamer.layer("obstacles")
+    first = collisions.chunk_mask(layer, (0, 3))
+    other = collisions.chunk_mask(layer, (1, 3))
+    streamer.load_now([(2, 3)])
+    assert collisions.chunk_mask(layer, (0, 3)) is first
+
+    # Taking a tile out rebakes its own chunk and no other
+    tile = layer.chunk_tiles((1, 3))[0]
+    layer.remove(tile)
+    assert collisions.chunk_mask(layer, (1, 3)) is not other
+    assert collisions.chunk_mask(layer, (0, 3)) is first
+
+
+def test_loaded_grid_mirrors_resident_chunks(streamer):
+    pytest.importorskip("numpy")
+    streamer.max_chunks = 4
+    for x in range(0, streamer.level.cols * TS, 50):
+        streamer.camera.x = x
+        streamer.update()
+        resident = set(streamer.resident())
+        assert {(cx, cy) for cy, cx in zip(*streamer.loaded.nonzero())} == resident
+    assert streamer.evictions
@@ -0,0 +1,98 @@
+import os
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import enemy
+import swarm
+from conftest import ROOT
+from enemy import PigEnemy
+from platformer import Sprite, build
+
+TS = 21
+
+
+@pytest.fixture(scope="module")
+def world(images):
+    platforms = build(os.path.join(ROOT, "platformer_platformer.csv"), TS)
+    walk = Sprite("pig.png", (0, 0, 32, 32), 5, (0, 0, 0), 30, left_rect=(0, 0, 32, 32))
+    idle = Sprite("pig.png", (0, 32, 32, 32), 5, (0, 0, 0), 30, left_rect=(0, 32, 32, 32))
+    return platforms, walk, idle
+
+
+def _pigs(world, n=100):
+    platforms, walk, idle = world
+    r = random.Random(5)
+    return [PigEnemy(walk, idle, r.choice(platforms), platforms, TS, speed=r.choice((0.6, 0.7, 1.3, 2.0)))
+            for _ in range(n)]
+
+
+def _state(pigs):
+    return [(p.left, p.state, p.velocity_x, p.dir_sign, bool(p.flip_x), p.pause_point, p.pause_timer)
+            for p in pigs]
+
+
+def test_swarm_matches_per_pig_moves(world):
+    ticks = 1200
+    # Active mask: all pigs, then every other pig for a while, as chunk streaming would
+    masks = [None if t < 800 or t >= 1000 else [i % 2 == 0 for i in range(100)] for t in range(ticks)]
+
+    pigs = _pigs(world)
+    enemy.rng.seed(11)
+    expected = []
+    for mask in masks:
+        for i, pig in enumerate(pigs):
+            if mask is None or mask[i]:
+                pig.move()
+        expected.append(_state(pigs))
+
+    views = _pigs(world)
+    rng = random.Random(11)
+    pigs = swarm.PatrolSwarm(views, rng)
+    for tick, mask in enumerate(masks):
+        pigs.step(mask)
+        pigs.sync()
+        assert _state(views) == expected[tick], f"tick {tick}"
+    # Same random numbers drawn, in the same order
+    assert rng.getstate() == enemy.rng.getstate()
+
+
+def test_in_chunks_matches_per_pig_lookups(world):
+    import numpy as np
+    pigs = _pigs(world)
+    crowd = swarm.PatrolSwarm(pigs, random.Random(0))
+    chunk_px = 5 * TS
+    rows, cols = 3, 6  # leaves the bottom and right of the level outside the grid
+    loaded = np.array([[random.Random(r * cols + c).random() < 0.5 for c in range(cols)] for r in range(rows)])
+    expected = []
+    for pig in pigs:
+        cx, cy = int(pig.x // chunk_px), int(pig.y // chunk_px)
+        expected.append(0 <= cx < cols and 0 <= cy < rows and bool(loaded[cy, cx]))
+    assert 0 < sum(expected) < len(pigs)
+    assert crowd.in_chunks(loaded, chunk_px).tolist() == expected
+
+
+def test_near_syncs_only_the_pigs_it_returns(world):
+    from pygame import Rect
+    views = _pigs(world)
+    pigs = swarm.PatrolSwarm(views, random.Random(3))
+    for _ in range(300):
+        pigs.step()
+    stale = _state(views)
+    rect = Rect(200, 100, 300, 300)
+    inside = [i for i in range(len(views))
+              if pigs.left[i] < rect.right and pigs.left[i] + pigs.width[i] > rect.left
+              and pigs.top[i] < rect.bottom and pigs.top[i] + pigs.height[i] > rect.top]
+    assert 0 < len(inside) < len(views)
+    found = pigs.near(rect)
+    assert found == [views[i] for i in inside]
+    near_state = _state(views)
+    pigs.sync()
+    synced = _state(views)
+    assert [near_state[i] for i in inside] == [synced[i] for i in inside]
+    outside = [i for i in range(len(views)) if i not in inside]
+    assert [near_state[i] for i in outside] == [stale[i] for i in outside]
+    assert all(views[i].sprite is (views[i].idle_sprite if synced[i][1] == "idle" else views[i].walk_sprite)
+               for i in range(len(views)))
@@ -0,0 +1,75 @@
+"""Fixed-timestep game clock.
+
+Game logic always advances in ticks of exactly TICK seconds, however fast or
+slow frames are rendered. FixedTimestep turns the real frame time pgzero
+passes to update(dt) into a number of logic ticks to run, and Interpolator
+blends actor positions between the last two ticks when drawing.
+"""
+
+TICK_RATE = 60           # logic ticks per second
+TICK = 1.0 / TICK_RATE   # seconds per tick
+
+
+def ticks(seconds):
+    """Whole number of logic ticks lasting `seconds` of real time."""
+    return int(round(seconds * TICK_RATE))
+
+
+class FixedTimestep(object):
+    def __init__(self, tick=TICK, max_steps=5):
+        self.tick = tick
+        # Cap on catch-up ticks per frame, so a long stall (window drag, breakpoint)
+        # doesn't snowball into ever slower frames
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, dt):
+        """Bank dt seconds of real time; return how many logic ticks are due."""
+        self.accumulator += max(0.0, dt)
+        steps = int(self.accumulator / self.tick)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = steps * self.tick  # drop the rest of the backlog
+        self.accumulator = max(0.0, self.accumulator - steps * self.tick)
+        return steps
+
+    @property
+    def alpha(self):
+        """How far (0..1) real time has got into the next, not yet simulated, tick."""
+        return min(1.0, self.accumulator / self.tick)
+
+
+class Interpolator(object):
+    def __init__(self, snap_distance=64):
+        # Moves longer than this in one tick are teleports (respawn, warp): don't blend them
+        self.snap_distance = snap_distance
+        self._prev = {}
+
+    def capture(self, actors):
+        """Remember where actors are before a logic tick moves them."""
+        self._prev = {id(a): (a.left, a.top) for a in actors}
+
+    def blend(self, actors, alpha):
+        """Move actors to their interpolated draw positions; returns what restore() needs."""
+        saved = []
+        for a in actors:
+            prev = self._prev.get(id(a))
+            if prev is None:
+                continue
+            left, top = a.left, a.top
+            dx = left - prev[0]
+            dy = top - prev[1]
+            if (dx or dy) and abs(dx) <= self.snap_distance and abs(dy) <= self.snap_distance:
+                saved.append((a, left, top))
+                a.left = prev[0] + dx * alpha
+                a.top = prev[1] + dy * alpha
+        return saved
+
+    def restore(self, saved):
+        """Put actors back at their simulated positions after drawing."""
+        for a, left, top in saved:
+            a.left = left
+            a.top = top
@@ -0,0 +1,189 @@
+"""Single-pass loader for Tiled TMX maps.
+
+load_tmx() streams the map once and returns every tile layer as a flat,
+row-major cell list in the same convention as the CSV exports read by
+platformer.read_csv_layer: the tile id local to its tileset, -1 for empty
+cells, and Tiled's flip flags kept in the top bits. build_layer() accepts
+those cells directly, so a TMX layer and its CSV export build the same tiles.
+"""
+import base64
+import gzip
+import os
+import zlib
+import xml.etree.ElementTree as ET
+
+from platformer import FLIPPED_H, FLIPPED_V, FLIPPED_D, ROTATED_HEX
+
+FLAG_BITS = FLIPPED_H | FLIPPED_V | FLIPPED_D | ROTATED_HEX
+
+
+class Tileset(object):
+    def __init__(self, firstgid, name, tile_width, tile_height, tilecount, columns, image, source=None):
+        self.firstgid = firstgid
+        self.name = name
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.tilecount = tilecount
+        self.columns = columns
+        self.image = image
+        self.source = source
+
+    def __repr__(self):
+        return f"Tileset({self.name!r}, firstgid={self.firstgid}, tilecount={self.tilecount})"
+
+
+class TileLayerData(object):
+    """Metadata and cells of one <layer>."""
+
+    def __init__(self, layer_id, name, width, height, cells, visible=True, opacity=1.0,
+                 offset=(0.0, 0.0), properties=None):
+        self.id = layer_id
+        self.name = name
+        self.width = width
+        self.height = height
+        self.cells = cells
+        self.visible = visible
+        self.opacity = opacity
+        self.offset = offset
+        self.properties = properties or {}
+
+    def __repr__(self):
+        return f"TileLayerData({self.name!r}, {self.width}x{self.height})"
+
+
+class TiledMap(object):
+    def __init__(self, attrs):
+        self.orientation = attrs.get("orientation", "orthogonal")
+        self.width = int(attrs["width"])
+        self.height = int(attrs["height"])
+        self.tile_width = int(attrs["tilewidth"])
+        self.tile_height = int(attrs["tileheight"])
+        self.tilesets = []
+        self.layers = {}  # name -> TileLayerData, in document order
+
+    def layer(self, name):
+        return self.layers[name]
+
+    def cells(self, name):
+        return self.layers[name].cells
+
+
+def _read_tileset(elem, base_dir):
+    firstgid = int(elem.get("firstgid", 1))
+    source = elem.get("source")
+    if source is not None:
+        path = os.path.join(base_dir, source)
+        ts = ET.parse(path).getroot()
+        image_dir = os.path.dirname(path)
+    else:
+        ts = elem
+        image_dir = base_dir
+    image = ts.find("image")
+    image_path = os.path.join(image_dir, image.get("source")) if image is not None else None
+    return Tileset(
+        firstgid,
+        ts.get("name"),
+        int(ts.get("tilewidth", 0)),
+        int(ts.get("tileheight", 0)),
+        int(ts.get("tilecount", 0)),
+        int(ts.get("columns", 0)),
+        image_path,
+        source,
+    )
+
+
+def _decode_data(elem):
+    encoding = elem.get("encoding")
+    compression = elem.get("compression")
+    if elem.find("chunk") is not None:
+        raise ValueError("infinite (chunked) maps are not supported")
+    if encoding == "csv":
+        return [int(v) for v in elem.text.replace("\n", "").split(",") if v.strip()]
+    if encoding == "base64":
+        raw = base64.b64decode(elem.text.strip())
+        if compression == "zlib":
+            raw = zlib.decompress(raw)
+        elif compression == "gzip":
+            raw = gzip.decompress(raw)
+        elif compression:
+            raise ValueError(f"unsupported layer compression {compression!r}")
+        return [int.from_bytes(raw[i:i + 4], "little") for i in range(0, len(raw), 4)]
+    if encoding is None:
+        return [int(tile.get("gid", 0)) for tile in elem.iter("tile")]
+    raise ValueError(f"unsupported layer encoding {encoding!r}")
+
+
+def _local_cells(gids, tilesets):
+    """Map global ids (0 = empty) to tileset-local ids (-1 = empty), keeping the flag bits."""
+    firsts = sorted(ts.firstgid for ts in tilesets) or [1]
+    cells = []
+    for value in gids:
+        gid = value & ~FLAG_BITS
+        if gid == 0:
+            cells.append(-1)
+            continue
+        first = firsts[0]
+        for candidate in firsts:
+            if candidate > gid:
+                break
+            first = candidate
+        cells.append((gid - first) | (value & FLAG_BITS))
+    return cells
+
+
+def load_tmx(filename):
+    """Read every tile layer, tileset and layer attribute of a TMX map in one pass."""
+    base_dir = os.path.dirname(os.path.abspath(filename))
+    tiled_map = None
+    properties = {}
+    for event, elem in ET.iterparse(filename, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == "map":
+                tiled_map = TiledMap(elem.attrib)
+            elif tag == "layer":
+                properties = {}
+            continue
+        if tag == "tileset" and tiled_map is not None and elem.get("firstgid") is not None:
+            tiled_map.tilesets.append(_read_tileset(elem, base_dir))
+        elif tag == "property":
+            properties[elem.get("name")] = elem.get("value", elem.text)
+        elif tag == "layer":
+            data = elem.find("data")
+            gids = _decode_data(data) if data is not None else []
+            layer = TileLayerData(
+                int(elem.get("id", 0)),
+                elem.get("name"),
+                int(elem.get("width", tiled_map.width)),
+                int(elem.get("height", tiled_map.height)),
+                _local_cells(gids, tiled_map.tilesets),
+                visible=elem.get("visible", "1") != "0",
+                opacity=float(elem.get("opacity", 1.0)),
+                offset=(float(elem.get("offsetx", 0)), float(elem.get("offsety", 0))),
+                properties=properties,
+            )
+            tiled_map.layers[layer.name] = layer
+            elem.clear()
+    if tiled_map is None:
+        raise ValueError(f"{filename} is not a TMX map")
+    return tiled_map
+
+
+def map_outline(filename):
+    """(external tileset paths, tile layer names) of a TMX map, without decoding any layer data.
+
+    Layer names come in document order, once each, as load_tmx() keys them.
+    """
+    base_dir = os.path.dirname(os.path.abspath(filename))
+    tilesets = []
+    names = {}
+    for event, elem in ET.iterparse(filename, events=("start", "end")):
+        if event == "end":
+            if elem.tag == "data":
+                elem.clear()
+            continue
+        if elem.tag == "tileset" and elem.get("source") is not None:
+            tilesets.append(os.path.join(base_dir, elem.get("source")))
+        elif elem.tag == "layer":
+            names.setdefault(elem.get("name"))
+    return tilesets, list(names)